@@ -1,10 +1,12 @@
-from langgraph.graph import StateGraph, END
+from langgraph.graph import StateGraph, START, END
 from typing import TypedDict
 from langchain_groq import ChatGroq
 from .retriever import get_retriever
-from .tools import web_search, should_use_web_search
+from .tools import web_search
+from .intent import classify
+from sqlalchemy import select
 from database.models import User, UserProfile
-from database.database import SessionLocal
+from database.database import AsyncSessionLocal
 import os
 
 
@@ -18,6 +20,8 @@ class AgentState(TypedDict):
     user_id: int
     user_profile: str
     web_context: str
+    needs_web: bool
+    needs_rag: bool
 
 
 # =========================
@@ -52,24 +56,54 @@ def create_graph():
     workflow = StateGraph(AgentState)
 
     # ==========================================
-    # NODE 1: FETCH USER PROFILE
+    # NODE 0: ROUTE (no I/O)
     # ==========================================
-    def fetch_profile_node(state: AgentState):
+    def route_node(state: AgentState):
+
+        intent = classify(state["input"][:500], state.get("history", ""))
 
-        db = SessionLocal()
+        if intent.route == "canned":
+            # Greetings, thanks, bye: answered without profile, search, RAG or LLM
+            user_input = state["input"].strip()[:500]
+            history = state.get("history", "")
+            if user_input:
+                history = f"{truncate_history(history, 4)}\nUSER: {user_input}\nAI: {intent.canned_reply}"
+            return {
+                "output": intent.canned_reply,
+                "history": history,
+                "needs_web": False,
+                "needs_rag": False,
+            }
+
+        return {"needs_web": intent.needs_web, "needs_rag": intent.needs_rag}
+
+    def after_route(state: AgentState):
+        if not (state.get("needs_web") or state.get("needs_rag")):
+            return END
+        return ["fetch_profile", "search"]
+
+    # ==========================================
+    # NODE 1: FETCH USER PROFILE
+    # ==========================================
+    async def fetch_profile_node(state: AgentState):
 
         try:
             user_id = state.get("user_id")
 
-            user = db.query(User).filter(User.id == user_id).first()
-            profile = db.query(UserProfile).filter(
-                UserProfile.user_id == user_id
-            ).first()
+            async with AsyncSessionLocal() as db:
+                user = (await db.execute(
+                    select(User.first_name, User.email).where(User.id == user_id)
+                )).first()
+                profile = (await db.execute(
+                    select(UserProfile.skills, UserProfile.projects).where(
+                        UserProfile.user_id == user_id
+                    )
+                )).first()
 
             if user:
                 user_name = (
                     user.first_name
-                    if hasattr(user, "first_name") and user.first_name
+                    if user.first_name
                     else user.email.split("@")[0]
                 )
             else:
@@ -94,21 +128,20 @@ User Profile:
 
         except Exception:
             return {"user_profile": "User Profile: Not available"}
-        finally:
-            db.close()
 
     # ==========================================
-    # NODE 2: OPTIONAL WEB SEARCH
+    # NODE 2: OPTIONAL WEB SEARCH (runs alongside NODE 1)
     # ==========================================
-    def search_node(state: AgentState):
+    async def search_node(state: AgentState):
 
         user_input = state["input"]
 
-        if not should_use_web_search(user_input):
+        if not state.get("needs_web"):
             return {"web_context": ""}
 
         try:
-            results = web_search(user_input)
+            # DDGS is blocking; ainvoke runs the tool in a worker thread
+            results = await web_search.ainvoke(user_input)
             return {"web_context": results[:2000] if results else ""}
         except Exception:
             return {"web_context": ""}
@@ -116,25 +149,19 @@ User Profile:
     # ==========================================
     # NODE 3: GENERATE RESPONSE (Single LLM Call)
     # ==========================================
-    def mentor_node(state: AgentState):
+    async def mentor_node(state: AgentState):
 
         user_input = state["input"].strip()[:500]
 
-        if not user_input:
-            return {
-                "output": "Hi! I'm your career mentor. Ask me about internships, placements, skills, or career advice.",
-                "history": state.get("history", ""),
-            }
-
         chat_history = truncate_history(state.get("history", ""), 4)
         user_profile = state.get("user_profile", "")
         web_context = state.get("web_context", "")
 
-        # 🔹 RAG only if no web search
+        # 🔹 RAG if the router asked for it, or as a fallback when search came back empty
         rag_context = ""
-        if not web_context and retriever is not None:
+        if (state.get("needs_rag") or not web_context) and retriever is not None:
             try:
-                docs = retriever.invoke(user_input)
+                docs = await retriever.ainvoke(user_input)
                 rag_context = "\n".join(
                     [doc.page_content for doc in docs]
                 ) if docs else ""
@@ -168,7 +195,8 @@ INSTRUCTIONS:
 Your response:
 """
 
-        response = llm.invoke(prompt)
+        # Async call, so /ai/chat/stream can forward tokens via astream_events
+        response = await llm.ainvoke(prompt)
         response_text = (
             response.content if hasattr(response, "content") else str(response)
         )
@@ -183,13 +211,16 @@ Your response:
     # ==========================================
     # BUILD WORKFLOW
     # ==========================================
+    workflow.add_node("route", route_node)
     workflow.add_node("fetch_profile", fetch_profile_node)
     workflow.add_node("search", search_node)
     workflow.add_node("mentor", mentor_node)
 
-    workflow.set_entry_point("fetch_profile")
-    workflow.add_edge("fetch_profile", "search")
-    workflow.add_edge("search", "mentor")
+    # Trivial turns end at the router; the rest fan out to profile fetch and
+    # web search (independent), joining before mentor
+    workflow.add_edge(START, "route")
+    workflow.add_conditional_edges("route", after_route, ["fetch_profile", "search", END])
+    workflow.add_edge(["fetch_profile", "search"], "mentor")
     workflow.add_edge("mentor", END)
 
     print("✅ Optimized graph compiled (Single LLM mode)")
@@ -0,0 +1,166 @@
+import re
+from dataclasses import dataclass
+
+
+# Phrases that need fresh information from the web (previously the
+# keyword lists inside tools.should_use_web_search).
+WEB_KEYWORDS = [
+    # time-sensitive
+    "current", "latest", "recent", "now", "today",
+    "2024", "2025", "2026", "this year", "upcoming", "new",
+    # job market
+    "hiring", "recruitment", "openings", "vacancies",
+    "job opportunities", "positions", "recruiting",
+    "job market", "placement", "campus placement",
+    # internships
+    "internship", "intern", "summer internship",
+    "winter internship", "stipend", "training",
+    # salary & compensation
+    "salary", "package", "ctc", "lpa",
+    "pay", "compensation", "per annum", "wage",
+    # trending tech & skills
+    "trending", "in-demand", "hot skills", "popular",
+    "emerging", "top skills", "demand", "required skills",
+    # companies
+    "companies hiring", "top companies", "best companies",
+    "startups", "mnc", "faang", "maang", "product based",
+    "google", "microsoft", "amazon", "meta", "apple", "netflix",
+    # statistics & comparisons
+    "statistics", "data", "report", "survey",
+    "vs", "compare", "comparison", "worth it",
+    # platforms
+    "linkedin", "naukri", "indeed", "glassdoor",
+    "internshala", "unstop", "geeksforgeeks",
+]
+
+# Topics the local knowledge base covers; asked together with a web
+# keyword, the turn gets both web results and RAG context.
+RAG_KEYWORDS = [
+    "resume", "cv", "interview", "roadmap", "prepare", "preparation",
+    "project", "portfolio", "dsa", "aptitude", "cover letter",
+    "learn", "course", "career", "skill",
+]
+
+# Messages made only of these phrases get a canned reply. Fillers never
+# count on their own ("sir", "later"), only next to another phrase
+# ("bye sir", "see you later"). Acknowledgements ("ok", "got it") are
+# canned only when the last reply did not end with a question; otherwise
+# they are an answer to it.
+TRIVIAL_PHRASES = {
+    "greeting": [
+        "hi", "hii", "hiii", "hello", "hey", "heyy", "hola", "namaste",
+        "good morning", "good afternoon", "good evening",
+    ],
+    "thanks": [
+        "thanks", "thank you", "thankyou", "thx", "ty", "tysm",
+    ],
+    "acknowledgement": [
+        "ok", "okay", "great", "cool", "nice", "awesome", "got it",
+        "helpful", "that helps", "perfect",
+    ],
+    "farewell": [
+        "bye", "goodbye", "good night", "see you", "see ya", "take care",
+    ],
+    "identity": [
+        "who are you", "what are you", "what can you do", "help", "how does this work",
+    ],
+    "filler": [
+        "there", "bro", "sir", "mentor", "so much", "a lot", "very", "later",
+    ],
+}
+
+CANNED_REPLIES = {
+    "empty": "Hi! I'm your career mentor. Ask me about internships, placements, skills, or career advice.",
+    "greeting": "Hi! I'm your career mentor. Ask me about internships, placements, skills, or career advice.",
+    "thanks": "You're welcome! Is there anything else about internships, skills or placements I can help with?",
+    "acknowledgement": "Glad it helps! Ask me anytime about internships, skills or placements.",
+    "farewell": "Good luck with your preparation! Come back anytime you need career advice.",
+    "identity": (
+        "I'm your InternPath career mentor. I can suggest internships, explain which skills "
+        "to learn next, review your resume and projects, and help you prepare for interviews. "
+        "What would you like to start with?"
+    ),
+}
+
+
+def _alternation(phrases) -> str:
+    """
+    Phrases as a prefix trie ("intern|internship" -> "intern(?:ship)?"):
+    re does not factor alternations itself, and a flat list makes it retry
+    every phrase at every word.
+    """
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node) -> str:
+        # Longer continuations first, so "summer internship" wins over "summer".
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+def _compile():
+    # Keywords start at a word boundary and may carry a suffix ("interns",
+    # "internships"); trivial phrases must be whole words ("hi", not "history").
+    groups = [
+        rf"(?P<web>(?:{_alternation(WEB_KEYWORDS)})\w*)",
+        rf"(?P<rag>(?:{_alternation(RAG_KEYWORDS)})\w*)",
+    ]
+    groups += [rf"(?P<{kind}>(?:{_alternation(phrases)})\b)" for kind, phrases in TRIVIAL_PHRASES.items()]
+    # One alternation, so a single pass over the message finds every category.
+    return re.compile(r"\b(?:" + "|".join(groups) + ")")
+
+
+_PATTERN = _compile()
+_PUNCTUATION = re.compile(r"[\W_]+")
+
+
+@dataclass(frozen=True)
+class Intent:
+    route: str  # "canned", "web", "rag" or "both"
+    needs_web: bool
+    needs_rag: bool
+    canned_reply: str | None = None
+
+
+_CANNED = {kind: Intent("canned", False, False, reply) for kind, reply in CANNED_REPLIES.items()}
+_BOTH = Intent("both", True, True)
+_WEB = Intent("web", True, False)
+_RAG = Intent("rag", False, True)
+# Most specific first when a message mixes them ("hi, who are you?").
+_CANNED_PRIORITY = ("identity", "farewell", "thanks", "greeting", "acknowledgement")
+
+
+def _awaits_answer(history: str) -> bool:
+    """Whether the last AI turn in `history` (graph format) ended with a question."""
+    _, marker, last_reply = history.rpartition("AI: ")
+    return bool(marker) and last_reply.rstrip().endswith("?")
+
+
+def classify(message: str, history: str = "") -> Intent:
+    text = message.strip().lower()
+    if not text:
+        return _CANNED["empty"]
+
+    kinds = {match.lastgroup for match in _PATTERN.finditer(text)}
+
+    if "web" in kinds:
+        return _BOTH if "rag" in kinds else _WEB
+    if "rag" in kinds or not kinds:
+        return _RAG
+
+    # Only trivial phrases matched: canned if they are all there is, bar punctuation/emoji.
+    kinds.discard("filler")
+    if not kinds or _PUNCTUATION.sub("", _PATTERN.sub(" ", text)):
+        return _RAG
+    if "acknowledgement" in kinds and _awaits_answer(history):
+        return _RAG
+    return _CANNED[next(kind for kind in _CANNED_PRIORITY if kind in kinds)]
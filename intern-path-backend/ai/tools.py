@@ -1,9 +1,35 @@
+import os
+import re
+
 from langchain_core.tools import tool
 from ddgs import DDGS  # ✅ Updated import
 
-@tool
-def web_search(query: str) -> str:
-    """Search latest info from internet."""
+from services.request_cache import request_cache
+
+from .intent import classify
+
+WEB_SEARCH_CACHE_TTL_SECONDS = int(os.getenv("WEB_SEARCH_CACHE_TTL_SECONDS", "1800"))
+
+_STOPWORDS = frozenset("""
+a about am an and any are as at be can could do does for from get give how i
+in is it me my of on or please should show tell that the there these this to
+u us what whats when where which who why will with would you your
+""".split())
+_WORD = re.compile(r"[a-z0-9+#]+")
+
+
+def normalize_search_query(query: str) -> str:
+    """Cache key for a query: lowercased, stopwords dropped, tokens sorted and deduped."""
+    tokens = _WORD.findall(query.lower())
+    kept = sorted({token for token in tokens if token not in _STOPWORDS})
+    return " ".join(kept or tokens)
+
+
+def _search_ddgs(query: str) -> str | None:
+    """
+    Formatted top results, or None when the search failed or found nothing;
+    None is not cached, so an empty answer is retried on the next ask.
+    """
     try:
         print(f"🔍 Searching web: '{query}'")
         
@@ -19,7 +45,7 @@ def web_search(query: str) -> str:
         
         if not results:
             print("⚠️ No results from DDGS")
-            return "No current information found from web search."
+            return None
         
         print(f"✅ Found {len(results)} results")
         
@@ -39,7 +65,6 @@ Link: {link}
         
         full_output = "\n".join(output)
         print(f"📄 Output length: {len(full_output)} chars")
-        print(f"📄 Preview: {full_output[:200]}...")
         
         return full_output
         
@@ -47,7 +72,24 @@ Link: {link}
         import traceback
         print(f"❌ Web search error: {e}")
         traceback.print_exc()
-        return f"Web search unavailable: {str(e)}"
+        return None
+
+
+@tool
+def web_search(query: str) -> str:
+    """Search latest info from internet."""
+    # Students ask the same things ("latest internships", "top skills 2025");
+    # concurrent identical queries share one DDGS call (request_cache single-flight).
+    # Hit rates show up under the web:search family in /metrics/cache.
+    result = request_cache.get_or_compute(
+        f"web:search:{normalize_search_query(query)}",
+        lambda: _search_ddgs(query),
+        ttl_seconds=WEB_SEARCH_CACHE_TTL_SECONDS,
+        tags=("web:search",)
+    )
+    if result is None:
+        return "No current information found from web search."
+    return result
 
 
 def should_use_web_search(user_input: str) -> bool:
@@ -55,64 +97,5 @@ def should_use_web_search(user_input: str) -> bool:
     Determine if query needs real-time web search
     Returns True if user is asking about current/dynamic information
     """
-    user_input = user_input.lower()
-    
-    # Category 1: TIME-SENSITIVE (always search)
-    time_keywords = [
-        "current", "latest", "recent", "now", "today", 
-        "2024", "2025", "2026", "this year", "upcoming", "new"
-    ]
-    
-    # Category 2: JOB MARKET (high priority)
-    job_market_keywords = [
-        "hiring", "recruitment", "openings", "vacancies", 
-        "job opportunities", "positions", "recruiting",
-        "job market", "placement", "campus placement"
-    ]
-    
-    # Category 3: INTERNSHIPS
-    internship_keywords = [
-        "internship", "intern", "summer internship", 
-        "winter internship", "stipend", "training"
-    ]
-    
-    # Category 4: SALARY & COMPENSATION
-    salary_keywords = [
-        "salary", "package", "ctc", "lpa", "stipend",
-        "pay", "compensation", "per annum", "wage"
-    ]
-    
-    # Category 5: TRENDING TECH & SKILLS
-    trending_keywords = [
-        "trending", "in-demand", "hot skills", "popular",
-        "emerging", "top skills", "demand", "required skills"
-    ]
-    
-    # Category 6: COMPANIES
-    company_keywords = [
-        "companies hiring", "top companies", "best companies",
-        "startups", "mnc", "faang", "maang", "product based",
-        "google", "microsoft", "amazon", "meta", "apple", "netflix"  # ✅ Added specific companies
-    ]
-    
-    # Category 7: STATISTICS & COMPARISONS
-    data_keywords = [
-        "statistics", "data", "report", "survey",
-        "vs", "compare", "comparison", "worth it"
-    ]
-    
-    # Category 8: SPECIFIC PLATFORMS
-    platform_keywords = [
-        "linkedin", "naukri", "indeed", "glassdoor",
-        "internshala", "unstop", "geeksforgeeks"
-    ]
-    
-    # Combine all categories
-    all_keywords = (
-        time_keywords + job_market_keywords + internship_keywords +
-        salary_keywords + trending_keywords + company_keywords +
-        data_keywords + platform_keywords
-    )
-    
-    # Check if any keyword matches
-    return any(keyword in user_input for keyword in all_keywords)
\ No newline at end of file
+    # Keyword lists live in ai/intent.py, compiled once into one pattern.
+    return classify(user_input).needs_web
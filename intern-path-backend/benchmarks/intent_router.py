@@ -0,0 +1,111 @@
+"""
+Intent router benchmark.
+
+Classifies a corpus of chat messages with the compiled intent router and
+with the keyword-list scan it replaced, and reports per-message cost plus
+how many turns each route would have taken. By default the corpus is every
+user message stored in chat_messages (DB_URL from the environment); pass
+--corpus for a file with one message per line, or --sample for the small
+built-in set.
+
+    python benchmarks/intent_router.py
+    python benchmarks/intent_router.py --corpus messages.txt --rounds 200
+"""
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai.intent import WEB_KEYWORDS, classify  # noqa: E402
+
+
+SAMPLE_MESSAGES = [
+    "hi", "hello", "Hey there!", "good morning sir", "thanks", "thank you so much",
+    "ok thanks 👍", "bye", "who are you?", "what can you do",
+    "What are the latest internships for python developers?",
+    "how do I prepare for a google interview",
+    "which skills should I learn for data science",
+    "review my resume please",
+    "what is the average stipend for a web dev intern in bangalore",
+    "is DSA important for product based companies",
+    "how to build a portfolio with react projects",
+    "explain recursion with an example",
+    "Should I learn java or python first?",
+    "top companies hiring freshers in 2025",
+    "how can I improve my communication skills",
+    "what projects should I add for an ML internship",
+    "I know html and css, what next?",
+    "tell me about system design basics",
+    "is an MBA worth it after engineering",
+]
+
+
+def _legacy_should_use_web_search(user_input: str) -> bool:
+    # The pre-router implementation: substring scan over the keyword list.
+    user_input = user_input.lower()
+    return any(keyword in user_input for keyword in list(WEB_KEYWORDS))
+
+
+def _load_from_db(limit: int) -> list[str]:
+    from database.database import SessionLocal
+    from database.models import ChatMessage
+
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(ChatMessage.content)
+            .filter(ChatMessage.role == "user")
+            .order_by(ChatMessage.id.desc())
+            .limit(limit)
+            .all()
+        )
+        return [content for (content,) in rows if content is not None]
+    finally:
+        db.close()
+
+
+def _per_message_us(fn, messages: list[str], rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for message in messages:
+            fn(message)
+    return (time.perf_counter() - started) / (rounds * len(messages)) * 1e6
+
+
+def main(args):
+    if args.corpus:
+        with open(args.corpus, encoding="utf-8") as f:
+            messages = [line.rstrip("\n") for line in f if line.strip()]
+        source = args.corpus
+    elif args.sample:
+        messages, source = SAMPLE_MESSAGES, "built-in sample"
+    else:
+        messages, source = _load_from_db(args.limit), "chat_messages"
+        if not messages:
+            print("chat_messages has no user messages; using the built-in sample")
+            messages, source = SAMPLE_MESSAGES, "built-in sample"
+
+    legacy_us = _per_message_us(_legacy_should_use_web_search, messages, args.rounds)
+    router_us = _per_message_us(classify, messages, args.rounds)
+
+    routes = Counter(classify(message).route for message in messages)
+    legacy_web = sum(_legacy_should_use_web_search(message) for message in messages)
+
+    print(f"corpus:        {len(messages)} messages from {source}, {args.rounds} rounds")
+    print(f"legacy scan:   {legacy_us:.2f}us/message (web search only)")
+    print(f"intent router: {router_us:.2f}us/message (web, rag and canned in one pass)")
+    print(f"routes:        {dict(routes)}")
+    print(f"web search:    legacy {legacy_web}, router {routes['web'] + routes['both']}")
+    print(f"LLM skipped:   {routes['canned']} of {len(messages)} turns ({routes['canned'] / len(messages):.0%})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--corpus", help="file with one message per line")
+    parser.add_argument("--sample", action="store_true", help="use the built-in sample messages")
+    parser.add_argument("--limit", type=int, default=10000, help="most recent user messages to read from the database")
+    parser.add_argument("--rounds", type=int, default=100)
+    main(parser.parse_args())
@@ -0,0 +1,93 @@
+"""
+Login burst benchmark.
+
+Fires a burst of concurrent /login requests at a running backend while a
+probe keeps hitting a cheap route, and reports login throughput next to the
+probe's latency before and during the burst. With bcrypt in the password
+pool the probe latency should barely move.
+
+    uvicorn main:app --workers 1 &
+    python benchmarks/login_throughput.py --base-url http://127.0.0.1:8000 --logins 200
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+import httpx
+
+
+def _summary(latencies: list[float]) -> str:
+    if not latencies:
+        return "no samples"
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return (
+        f"n={len(ordered)} p50={statistics.median(ordered) * 1000:.1f}ms "
+        f"p95={p95 * 1000:.1f}ms max={ordered[-1] * 1000:.1f}ms"
+    )
+
+
+async def _probe(client: httpx.AsyncClient, path: str, interval: float, stop: asyncio.Event) -> list[float]:
+    latencies = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        await client.get(path)
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def _probe_for(client, path, interval, seconds) -> list[float]:
+    stop = asyncio.Event()
+    task = asyncio.create_task(_probe(client, path, interval, stop))
+    await asyncio.sleep(seconds)
+    stop.set()
+    return await task
+
+
+async def main(args):
+    limits = httpx.Limits(max_connections=args.concurrency + 2)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60) as client:
+        email = f"bench-{uuid.uuid4().hex[:12]}@example.com"
+        credentials = {"email": email, "password": "Bench-Passw0rd!"}
+        response = await client.post("/signup", json={"first_name": "Bench", "second_name": "User", **credentials})
+        response.raise_for_status()
+
+        baseline = await _probe_for(client, args.probe_path, args.probe_interval, args.baseline_seconds)
+
+        semaphore = asyncio.Semaphore(args.concurrency)
+        statuses: dict[int, int] = {}
+        login_latencies = []
+
+        async def login():
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post("/login", json=credentials)
+                login_latencies.append(time.perf_counter() - started)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        stop = asyncio.Event()
+        probe = asyncio.create_task(_probe(client, args.probe_path, args.probe_interval, stop))
+        started = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(args.logins)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        during = await probe
+
+    print(f"logins:      {args.logins} in {elapsed:.2f}s = {args.logins / elapsed:.1f}/s, statuses {statuses}")
+    print(f"login:       {_summary(login_latencies)}")
+    print(f"probe idle:  {_summary(baseline)}")
+    print(f"probe burst: {_summary(during)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--probe-path", default="/jobs/search?q=python")  # a sync route, served from the thread pool
+    parser.add_argument("--probe-interval", type=float, default=0.05)
+    parser.add_argument("--baseline-seconds", type=float, default=3)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,14 @@
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql, sqlite
+
+
+def insert_for(bind):
+    """
+    Dialect-specific insert() so callers get on_conflict_do_nothing/_update
+    on both Postgres and SQLite.
+    """
+    if bind.dialect.name == "postgresql":
+        return postgresql.insert
+    if bind.dialect.name == "sqlite":
+        return sqlite.insert
+    return insert
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean,Date,ForeignKey,JSON,Float,DateTime,Text
+from sqlalchemy import Column, Integer, String, Boolean,Date,ForeignKey,JSON,Float,DateTime,Text,Index
 from sqlalchemy.orm import relationship
 from database.database import Base
 from datetime import datetime
@@ -35,6 +35,32 @@ class Internship(Base):
     skills = Column(String(200))
     scraped_date = Column(Date)
 
+class Skill(Base):
+    __tablename__ = "skills"
+
+    id = Column(Integer,primary_key=True,index=True)
+    name = Column(String(100),unique=True,index=True,nullable=False)
+
+class InternshipSkill(Base):
+    __tablename__ = "internship_skills"
+
+    internship_id = Column(Integer,ForeignKey("internships.id",ondelete="CASCADE"),primary_key=True)
+    skill_id = Column(Integer,ForeignKey("skills.id",ondelete="CASCADE"),primary_key=True)
+
+    __table_args__ = (
+        Index("ix_internship_skills_skill_internship","skill_id","internship_id"),
+    )
+
+class InternshipDomain(Base):
+    __tablename__ = "internship_domains"
+
+    internship_id = Column(Integer,ForeignKey("internships.id",ondelete="CASCADE"),primary_key=True)
+    domain = Column(String(50),primary_key=True)
+
+    __table_args__ = (
+        Index("ix_internship_domains_domain_internship","domain","internship_id"),
+    )
+
 class UserProfile(Base):
     __tablename__ = "userprofile"
 
@@ -71,4 +97,38 @@ class ChatMessage(Base):
     content = Column(Text)
     timestamp = Column(DateTime,default=datetime.utcnow)
 
-    session = relationship("ChatSession",back_populates="messages")
\ No newline at end of file
+    session = relationship("ChatSession",back_populates="messages")
+
+class IngestJob(Base):
+    __tablename__ = "ingest_jobs"
+
+    id = Column(String(36),primary_key=True)
+    status = Column(String(20),default="queued",index=True)
+    received = Column(Integer,default=0)
+    upserted = Column(Integer,default=0)
+    error = Column(Text,nullable=True)
+    created_at = Column(DateTime,default=datetime.utcnow)
+    finished_at = Column(DateTime,nullable=True)
+
+class CrawlState(Base):
+    __tablename__ = "crawl_state"
+
+    url = Column(String,primary_key=True)
+    etag = Column(String,nullable=True)
+    last_modified = Column(String,nullable=True)
+    content_hash = Column(String(64),nullable=True)
+    last_status = Column(Integer,nullable=True)
+    last_crawled_at = Column(DateTime,default=datetime.utcnow)
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer,primary_key=True)
+    user_id = Column(Integer,ForeignKey("users.id",ondelete="CASCADE"),nullable=False,index=True)
+    # sha256 of the token; the token itself is never stored
+    token_hash = Column(String(64),nullable=False,unique=True,index=True)
+    # every token rotated from the same login shares a family
+    family_id = Column(String(32),nullable=False,index=True)
+    created_at = Column(DateTime,default=datetime.utcnow)
+    expires_at = Column(DateTime,nullable=False)
+    revoked_at = Column(DateTime,nullable=True)
@@ -0,0 +1,133 @@
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+# Upper bounds, in milliseconds, of the checkout wait histogram.
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+
+class PoolMetrics:
+    """Checkout waits and connection churn for one pool; thread-safe."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.wait_seconds = 0.0
+            self.wait_max_seconds = 0.0
+            self.wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+            self.connects = 0
+            self.invalidations = 0
+            self.peak_checked_out = 0
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds += seconds
+            self.wait_max_seconds = max(self.wait_max_seconds, seconds)
+            self.wait_buckets[bisect.bisect_left(WAIT_BUCKETS_MS, seconds * 1000)] += 1
+
+    def record(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def record_checked_out(self, checked_out: int):
+        with self._lock:
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            labels = [f"<={bound}ms" for bound in WAIT_BUCKETS_MS] + [f">{WAIT_BUCKETS_MS[-1]}ms"]
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": round(self.wait_seconds / attempts * 1000, 3) if attempts else None,
+                "wait_max_ms": round(self.wait_max_seconds * 1000, 3),
+                "wait_histogram": dict(zip(labels, self.wait_buckets)),
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "peak_checked_out": self.peak_checked_out,
+            }
+
+
+# Per thread and per greenlet (async engines), unlike a threading.local.
+_timing_checkout: ContextVar[bool] = ContextVar("timing_checkout", default=False)
+
+
+class _TimedCheckout:
+    """
+    Pool mixin that times every checkout, including the time spent queued
+    behind other requests when the pool and its overflow are exhausted.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        metrics = self.metrics = PoolMetrics()
+        # recreate() (engine.dispose()) hands the old pool's listeners over
+        # via _dispatch; registering again would count every event twice.
+        if kwargs.get("_dispatch") is None:
+            event.listen(self, "connect", lambda *_: metrics.record("connects"))
+            event.listen(self, "invalidate", lambda *_: metrics.record("invalidations"))
+
+    def recreate(self):
+        # Same metrics object the carried-over listeners write to.
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def _do_get(self):
+        # QueuePool._do_get recurses on races; only the outermost call is timed.
+        if _timing_checkout.get():
+            return super()._do_get()
+        token = _timing_checkout.set(True)
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        finally:
+            _timing_checkout.reset(token)
+        self.metrics.record_wait(time.perf_counter() - started)
+        self.metrics.record_checked_out(self.checkedout())
+        return connection
+
+
+class InstrumentedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class InstrumentedAsyncAdaptedQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_stats(engine) -> dict:
+    """Current occupancy of the engine's pool plus its checkout metrics, if instrumented."""
+    pool = engine.pool
+    stats = {"pool": type(pool).__name__, "status": pool.status()}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+            "max_overflow": pool._max_overflow,
+            "timeout_seconds": pool.timeout(),
+        })
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        stats.update(metrics.snapshot())
+    return stats
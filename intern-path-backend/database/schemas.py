@@ -33,6 +33,9 @@ class LoginSchema(BaseModel):
 class GoogleAuthSchema(BaseModel):
     token: str
 
+class RefreshTokenSchema(BaseModel):
+    refresh_token: str
+
 class InternshipOut(BaseModel):
     title: str
     company: str
@@ -47,6 +50,33 @@ class InternshipOut(BaseModel):
     class Config:
         from_attributes = True
 
+class InternshipIn(BaseModel):
+    title: str
+    company: str
+    link: str
+    source: str
+    keyword: Optional[str] = None
+    location: Optional[str] = None
+    duration: Optional[str] = None
+    stipend: Optional[str] = None
+    skills: Optional[str] = None
+    scraped_date: Optional[date] = None
+
+class ScrapeRequest(BaseModel):
+    listings: List[InternshipIn] = []
+
+class IngestJobOut(BaseModel):
+    id: str
+    status: str
+    received: int
+    upserted: int
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
 class UserProfileCreate(BaseModel):
     year : Optional[int] = None
     semester: Optional[int] = None
@@ -1,28 +1,78 @@
+import os
+from dataclasses import dataclass
+
 from fastapi import Depends,HTTPException,status
 from fastapi.security import HTTPBearer,HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import event
 
 from database import database
+from database.database import get_async_db, get_db
 from database.models import User
 from security import decode_access_token
+from services.request_cache import request_cache
+
+
+PRINCIPAL_CACHE_TTL_SECONDS = int(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
 
 
 security  = HTTPBearer()
-def get_db():
-    db = database.SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    The authenticated user as handlers see it: plain column values, no
+    session attached. Load the ORM User explicitly if you need to write it.
+    """
+    id: int
+    email: str
+    first_name: str
+    second_name: str
+    is_google_user: bool
+
+
+def _principal_key(user_id: int) -> str:
+    return f"auth:principal:{user_id}"
+
+
+def _load_principal(user_id: int) -> Principal | None:
+    with database.SessionLocal() as db:
+        row = db.query(
+            User.id, User.email, User.first_name, User.second_name, User.is_google_user
+        ).filter(User.id == user_id).first()
+    if row is None:
+        return None
+    return Principal(
+        id=row.id,
+        email=row.email,
+        first_name=row.first_name,
+        second_name=row.second_name,
+        is_google_user=bool(row.is_google_user)
+    )
+
+
+def invalidate_principal(user_id: int):
+    request_cache.delete(_principal_key(user_id))
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _user_changed(mapper, connection, target):
+    invalidate_principal(target.id)
+
 
 def get_current_user(
-        credentials: HTTPAuthorizationCredentials = Depends(security),
-        db:Session = Depends(get_db)
-):
+        credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> Principal:
+    """
+    Validates the bearer token and returns its Principal. Principals are
+    cached per user for PRINCIPAL_CACHE_TTL_SECONDS and dropped whenever the
+    User row changes, so most requests never touch the database here.
+    """
     token = credentials.credentials
     payload = decode_access_token(token)
 
-    if payload is None:
+    if not isinstance(payload, dict):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token",
@@ -30,14 +80,21 @@ def get_current_user(
         )
     user_id = payload.get("sub") or payload.get("user_id")
 
-    if user_id is None:
+    try:
+        user_id = int(user_id)
+    except (TypeError, ValueError):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token payload",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
-    user = db.query(User).filter(User.id == int(user_id)).first()
+
+    user = request_cache.get_or_compute(
+        _principal_key(user_id),
+        lambda: _load_principal(user_id),
+        ttl_seconds=PRINCIPAL_CACHE_TTL_SECONDS,
+        tags=(f"user:{user_id}",)
+    )
 
     if user is None:
         raise HTTPException(
@@ -45,4 +102,4 @@ def get_current_user(
             detail="User not found",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    return user
\ No newline at end of file
+    return user
@@ -1,5 +1,6 @@
 import asyncio
 import sys
+from contextlib import asynccontextmanager
 
 if sys.platform == "win32":
     asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
@@ -12,15 +13,37 @@ from fastapi.middleware.cors import CORSMiddleware
 
 
 # Local imports (Works when Root Directory = backend)
-from database.database import engine
+from database.database import async_engine, engine, SessionLocal
 from database import models
-from routers import auth ,internship,user_profile,chatbot,fake_detector,resume_analyzer,scoring
+from routers import auth ,internship,user_profile,chatbot,fake_detector,resume_analyzer,scoring,automation,metrics
 from fastapi.middleware.gzip import GZipMiddleware
+from services.search import get_search_backend
+from services.domains import backfill_domains
+from services.skill_catalog import backfill_internship_skills
+from services.cache_warmer import CACHE_WARM_ON_STARTUP, cache_warmer
+from services.refresh_tokens import purge_refresh_tokens
 
 # Create Tables
 models.Base.metadata.create_all(bind=engine)
+get_search_backend(engine).ensure_schema(engine)
 
-app = FastAPI()
+# One-time backfills of precomputed internship domains and skills; drop dead refresh tokens
+with SessionLocal() as db:
+    backfill_domains(db)
+    backfill_internship_skills(db)
+    purge_refresh_tokens(db)
+
+# Fill the listing caches in the background before the first users arrive
+if CACHE_WARM_ON_STARTUP:
+    cache_warmer.schedule("startup")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Pooled aiosqlite connections each hold a non-daemon thread; close them so the process can exit
+    await async_engine.dispose()
+
+app = FastAPI(lifespan=lifespan)
 
 # Add CORS so Frontend can talk to Backend
 app.add_middleware(
@@ -48,5 +71,7 @@ app.include_router(chatbot.router)
 app.include_router(fake_detector.router)
 app.include_router(resume_analyzer.router)
 app.include_router(scoring.router)
+app.include_router(automation.router)
+app.include_router(metrics.router)
 
 
@@ -1,28 +1,27 @@
 from fastapi import APIRouter,Depends,HTTPException
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from database.database import SessionLocal
+from dependencies import get_async_db, get_db
 from database.models import User
-from database.schemas import SignupSchema,LoginSchema,GoogleAuthSchema
+from database.schemas import SignupSchema,LoginSchema,GoogleAuthSchema,RefreshTokenSchema
 from security import hash_password,verify_password,create_access_token
 from routers.google_auth import handle_google_signup_or_login
+from services.refresh_tokens import issue_refresh_token, revoke_refresh_token, rotate_refresh_token
 
 router = APIRouter()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.post("/signup")
-def manual_signup(data: SignupSchema, db: Session = Depends(get_db)):
-    existing = db.query(User).filter(User.email == data.email).first()
+async def manual_signup(data: SignupSchema, db: AsyncSession = Depends(get_async_db)):
+    existing = (await db.execute(select(User.id).where(User.email == data.email))).first()
+    # End the transaction so no pooled connection is held while bcrypt runs.
+    await db.commit()
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    hashed = hash_password(data.password)
+    hashed = await hash_password(data.password)
 
     user = User(
         first_name=data.first_name,
@@ -32,8 +31,12 @@ def manual_signup(data: SignupSchema, db: Session = Depends(get_db)):
         is_google_user=False
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Same email signed up concurrently while this one was hashing.
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Email already registered")
     full_name = f"{user.first_name} {user.second_name}".strip()
     token = create_access_token(
         data={
@@ -42,25 +45,51 @@ def manual_signup(data: SignupSchema, db: Session = Depends(get_db)):
             "email":user.email
         }
     )
+    refresh_token = issue_refresh_token(db, user.id)
+    await db.commit()
     return {
-        "access_token":token
+        "access_token":token,
+        "refresh_token":refresh_token
     }
 
 @router.post("/login")
-def manual_login(data: LoginSchema, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == data.email).first()
+async def manual_login(data: LoginSchema, db: AsyncSession = Depends(get_async_db)):
+    user = (await db.execute(
+        select(User.id, User.first_name, User.second_name, User.email, User.password, User.is_google_user)
+        .where(User.email == data.email)
+    )).first()
+    # End the transaction so no pooled connection is held while bcrypt runs.
+    await db.commit()
     if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     if user.is_google_user:
         raise HTTPException(status_code=400, detail="Use Google Sign-In for this account")
 
-    if not verify_password(data.password, user.password):
+    if not await verify_password(data.password, user.password):
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     token = create_access_token(data={"sub": str(user.id),"username":f"{user.first_name} {user.second_name}","email":user.email})
-    return {"access_token": token}
+    refresh_token = issue_refresh_token(db, user.id)
+    await db.commit()
+    return {"access_token": token, "refresh_token": refresh_token}
 
 @router.post("/google-auth")
 def google_signup_or_login(data: GoogleAuthSchema, db: Session = Depends(get_db)):
-    return handle_google_signup_or_login(data.token, db)
\ No newline at end of file
+    return handle_google_signup_or_login(data.token, db)
+
+@router.post("/token/refresh")
+def refresh_access_token(data: RefreshTokenSchema, db: Session = Depends(get_db)):
+    # No password check: the refresh token is the credential, and it is single-use.
+    user_id, refresh_token = rotate_refresh_token(db, data.refresh_token)
+    user = db.query(User.id, User.first_name, User.second_name, User.email).filter(User.id == user_id).first()
+    if not user:
+        raise HTTPException(status_code=401, detail="User not found")
+
+    token = create_access_token(data={"sub": str(user.id),"username":f"{user.first_name} {user.second_name}".strip(),"email":user.email})
+    return {"access_token": token, "refresh_token": refresh_token}
+
+@router.post("/token/revoke")
+def revoke_token(data: RefreshTokenSchema, db: Session = Depends(get_db)):
+    revoke_refresh_token(db, data.refresh_token)
+    return {"status": "revoked"}
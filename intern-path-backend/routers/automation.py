@@ -0,0 +1,40 @@
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from database import models
+from database.schemas import IngestJobOut, ScrapeRequest
+from dependencies import get_db
+from security import verify_scraper_key
+from services.ingest import create_ingest_job, run_ingest_job
+
+router = APIRouter(
+    prefix="/automation",
+    tags=["Automation"],
+    dependencies=[Depends(verify_scraper_key)]
+)
+
+
+@router.post("/scrape-weekly", response_model=IngestJobOut, status_code=status.HTTP_202_ACCEPTED)
+def scrape_weekly(
+    background_tasks: BackgroundTasks,
+    data: ScrapeRequest | None = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Queues an ingest and returns the job right away. Posted listings are
+    upserted as-is; with no body the configured sources are scraped.
+    Poll /automation/jobs/{job_id} for the outcome.
+    """
+    listings = [listing.model_dump() for listing in data.listings] if data and data.listings else None
+
+    job = create_ingest_job(db)
+    background_tasks.add_task(run_ingest_job, job.id, listings)
+    return job
+
+
+@router.get("/jobs/{job_id}", response_model=IngestJobOut)
+def get_ingest_job(job_id: str, db: Session = Depends(get_db)):
+    job = db.get(models.IngestJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Ingest job not found")
+    return job
@@ -1,70 +1,90 @@
-from fastapi import APIRouter,Depends,HTTPException
+import asyncio
+import json
+
+from fastapi import APIRouter,Depends,HTTPException,Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import datetime
 from typing import List
 
-from database.database import SessionLocal
+from database.database import AsyncSessionLocal
 from database.models import ChatMessage,ChatSession
 from database.schemas import ChatMessageResponse,ChatRequest,ChatResponse,ChatSessionResponse
 from ai.graph import create_graph
 from functools import lru_cache
-from dependencies import get_current_user
+from dependencies import get_async_db, get_current_user, get_db
 
 router = APIRouter(prefix="/ai",tags=["AI Chatbot"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @lru_cache()
 def get_graph():
     return create_graph()
 
-@router.post("/chat",response_model=ChatResponse)
-async def chat(req : ChatRequest,db:Session = Depends(get_db),current_user = Depends(get_current_user)):
-
-    try:
-        user_id = current_user.id
-        if not req.session_id:
-            session = ChatSession(user_id = user_id)
-            db.add(session)
-            db.commit()
-            db.refresh(session)
-        else:
-            session = db.query(ChatSession).filter(
+async def _begin_turn(db: AsyncSession, req: ChatRequest, user_id: int) -> tuple[int, str]:
+    """Finds or creates the session, stores the user message; returns (session_id, history_text)."""
+    if not req.session_id:
+        session = ChatSession(user_id = user_id)
+        db.add(session)
+        await db.flush()
+    else:
+        session = (await db.execute(
+            select(ChatSession).where(
                 ChatSession.id == req.session_id,
                 ChatSession.user_id == user_id
-            ).first()
-
-            print(session)
-
-            if not session:
-                raise HTTPException(
-                    status_code=404,
-                    detail="Session not found or you don't have access"
-                )
-        user_msg = ChatMessage(
-            session_id = session.id,
-            role = "user",
-            content = req.message
-        )
+            )
+        )).scalar_one_or_none()
 
-        db.add(user_msg)
-        db.commit()
+        if not session:
+            raise HTTPException(
+                status_code=404,
+                detail="Session not found or you don't have access"
+            )
+    session_id = session.id
+    user_msg = ChatMessage(
+        session_id = session_id,
+        role = "user",
+        content = req.message
+    )
 
-        messages = db.query(ChatMessage).filter(
-            ChatMessage.session_id == session.id
-        ).order_by(ChatMessage.timestamp.desc()).limit(6).all()
+    db.add(user_msg)
+    await db.commit()
 
-        messages = list(reversed(messages))
+    messages = (await db.execute(
+        select(ChatMessage.role, ChatMessage.content)
+        .where(ChatMessage.session_id == session_id)
+        .order_by(ChatMessage.timestamp.desc())
+        .limit(6)
+    )).all()
+
+    messages = list(reversed(messages))
+
+    history_text = "\n".join(
+        f"{msg.role.upper()}: {msg.content}"
+        for msg in messages[:-1]
+    )
+    return session_id, history_text
+
+
+async def _save_ai_message(db: AsyncSession, session_id: int, content: str) -> ChatMessage:
+    ai_msg = ChatMessage(
+        session_id = session_id,
+        role = "ai",
+        content = content
+    )
+    db.add(ai_msg)
+    await db.commit()
+    return ai_msg
+
+
+@router.post("/chat",response_model=ChatResponse)
+async def chat(req : ChatRequest,db:AsyncSession = Depends(get_async_db),current_user = Depends(get_current_user)):
+
+    try:
+        user_id = current_user.id
+        session_id, history_text = await _begin_turn(db, req, user_id)
 
-        history_text = "\n".join(
-            f"{msg.role.upper()}: {msg.content}"
-            for msg in messages[:-1]
-        )
         graph = get_graph()
         
         result = await graph.ainvoke({
@@ -74,27 +94,111 @@ async def chat(req : ChatRequest,db:Session = Depends(get_db),current_user = Dep
         })
 
         ai_response = result["output"]
-
-        ai_msg = ChatMessage(
-            session_id = session.id,
-            role = "ai",
-            content = ai_response
-        )
-
-        db.add(ai_msg)
-        db.commit()
-        db.refresh(ai_msg)
+        ai_msg = await _save_ai_message(db, session_id, ai_response)
 
         return ChatResponse(
-            session_id=session.id,
+            session_id=session_id,
             response=ai_response,
             timestamp=ai_msg.timestamp
         )
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500,detail=f"Internal server error : {str(e)}")
+
+
+_pending_saves: set[asyncio.Task] = set()
+
+
+async def _persist_ai_message(session_id: int, content: str) -> ChatMessage:
+    async with AsyncSessionLocal() as db:
+        return await _save_ai_message(db, session_id, content)
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/chat/stream")
+async def chat_stream(
+    req : ChatRequest,
+    request: Request,
+    db:AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Same turn as /chat, streamed as Server-Sent Events:
+    `session` (session_id) first, then `token` events as the mentor LLM
+    generates, then `done` with the stored message, or `error`.
+    The reply is saved once generation ends; if the client goes away
+    mid-answer, generation stops and the partial reply is saved.
+    """
+    user_id = current_user.id
+    try:
+        session_id, history_text = await _begin_turn(db, req, user_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=500,detail=f"Internal server error : {str(e)}")
+
+    async def events():
+        tokens = []
+        output = None
+        disconnected = False
+        yield _sse("session", {"session_id": session_id})
+        try:
+            async for event in get_graph().astream_events({
+                "input":req.message,
+                "history":history_text,
+                "user_id":user_id
+            }, version="v2"):
+                if await request.is_disconnected():
+                    disconnected = True
+                    break
+                kind = event["event"]
+                if kind == "on_chat_model_stream" and event["metadata"].get("langgraph_node") == "mentor":
+                    token = event["data"]["chunk"].content
+                    if token:
+                        tokens.append(token)
+                        yield _sse("token", {"content": token})
+                elif kind == "on_chain_end" and not event.get("parent_ids"):
+                    output = event["data"]["output"].get("output")
+        except asyncio.CancelledError:
+            disconnected = True
+        except Exception as e:
+            yield _sse("error", {"detail": f"Internal server error : {str(e)}"})
+            return
+
+        if output is None:
+            output = "".join(tokens)
+        elif not tokens and not disconnected:
+            # Canned replies from the intent router (greetings, thanks, empty input) skip the LLM
+            # and arrive only as the final state.
+            yield _sse("token", {"content": output})
+        if not output:
+            return
+
+        # Own task and session: the request's session is already closed, and a
+        # disconnect cancels this generator but must not cancel the save.
+        save = asyncio.ensure_future(_persist_ai_message(session_id, output))
+        _pending_saves.add(save)
+        save.add_done_callback(_pending_saves.discard)
+        ai_msg = await asyncio.shield(save)
+        if not disconnected:
+            yield _sse("done", {"session_id": session_id, "response": output, "timestamp": ai_msg.timestamp.isoformat()})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+            # GZipMiddleware would buffer the stream; it skips responses that set an encoding.
+            "Content-Encoding": "identity",
+        }
+    )
     
 @router.get("/session",response_model=List[ChatSessionResponse])
 def get_my_session(
@@ -1,8 +1,8 @@
-from google.oauth2 import id_token
-from google.auth.transport.requests import Request
 from fastapi import HTTPException
 from database.models import User
 from security import create_access_token
+from services.google_certs import google_cert_cache
+from services.refresh_tokens import issue_refresh_token
 import os
 
 GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
@@ -16,8 +16,8 @@ def handle_google_signup_or_login(token: str, db):
         raise HTTPException(status_code=500, detail="Server misconfiguration: missing Google Client ID")
 
     try:
-        # Verification of token
-        info = id_token.verify_oauth2_token(token, Request(), GOOGLE_CLIENT_ID)
+        # Verification of token, against Google's cached signing certificates
+        info = google_cert_cache.verify_id_token(token, GOOGLE_CLIENT_ID)
 
         email = info["email"]
         first_name = info.get("given_name", "User")
@@ -46,7 +46,9 @@ def handle_google_signup_or_login(token: str, db):
                 "email":user.email
             }
         )
-        return {"access_token": jwt_token}
+        refresh_token = issue_refresh_token(db, user.id)
+        db.commit()
+        return {"access_token": jwt_token, "refresh_token": refresh_token}
 
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid Google token")
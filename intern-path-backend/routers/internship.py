@@ -1,46 +1,45 @@
-from functools import lru_cache
-
-from fastapi import APIRouter, Depends, HTTPException,Query
-from sqlalchemy.orm import Session
-from sqlalchemy import text, or_
+from fastapi import APIRouter, Depends, HTTPException,Query,Request
+from sqlalchemy import text
 
 
 from database import models, database
 from dependencies import get_current_user
+from services.cache_warmer import cache_warmer, recent_users, search_activity
+from services.cached_response import cached_json_response
+from services.domains import domain_classifier
+from services.listings import (
+    acached_listing_page,
+    cached_domain_page,
+    cached_recommendations,
+    cached_search_page,
+    normalize_query,
+    search_backend,
+)
+from services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from services.request_cache import request_cache
+from services.skill_index import skill_index
 
 router = APIRouter(prefix="/jobs", tags=["Internships"])
 
 
-@lru_cache(maxsize=5000)
-def _parse_skill_text(skill_text: str) -> frozenset[str]:
-    if not skill_text:
-        return frozenset()
-    return frozenset(
-        part.strip().lower()
-        for part in skill_text.split(",")
-        if part and part.strip()
-    )
-
-
-def get_db():
-    db = database.SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 # ---RUN ONCE IF DB IS BROKEN ---
 @router.get("/fix-db")
 def fix_database():
     try:
         with database.engine.connect() as conn:
+            conn.execute(text("DROP TABLE IF EXISTS internship_domains CASCADE"))
+            conn.execute(text("DROP TABLE IF EXISTS internship_skills CASCADE"))
             conn.execute(text("DROP TABLE IF EXISTS internships CASCADE"))
+            # Crawl state vouches for rows that no longer exist; without this the
+            # next scrape gets 304s / hash matches and never refills the table.
+            conn.execute(text("DROP TABLE IF EXISTS crawl_state CASCADE"))
             conn.commit()
 
         models.Base.metadata.create_all(bind=database.engine)
-        request_cache.delete_prefix("jobs:")
+        search_backend.ensure_schema(database.engine)
+        skill_index.reset()
+        request_cache.invalidate_tags("jobs")
+        cache_warmer.schedule("fix-db")
         return {"status": "success", "message": "Database rebuilt!"}
 
     except Exception as e:
@@ -49,17 +48,16 @@ def fix_database():
 
 # To get the internship details from database
 @router.get("/")
-async def get_internship_details(db: Session = Depends(get_db)):
+async def get_internship_details(
+    request: Request,
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+):
     try:
-        cache_key = "jobs:list"
-        cached = request_cache.get(cache_key)
-        if cached is not None:
-            return cached
-
-        internships = db.query(models.Internship).order_by(models.Internship.id.desc()).all()
-        response = {"data": internships}
-        request_cache.set(cache_key, response, ttl_seconds=120)
-        return response
+        cached = await acached_listing_page(cursor, limit)
+        return cached_json_response(request, cached)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     except Exception as e:
         print(f"Database Error: {e}")
         raise HTTPException(status_code=500, detail="Database error. Try again...")
@@ -68,137 +66,47 @@ async def get_internship_details(db: Session = Depends(get_db)):
 # Filter endpoint
 
 @router.get("/filter")
-def filter_by_domain(domain: str,db:Session = Depends(get_db)):
-    domain = domain.lower().strip()
-    cache_key = f"jobs:filter:{domain}"
-    cached = request_cache.get(cache_key)
-    if cached is not None:
-        return cached
-
-    domain_keywords = {
-        "ai": ["ai", "artificial intelligence", "ml", "machine learning", "llm", "nlp"],
-        "web": ["web", "frontend", "backend", "full stack", "react", "django", "html", "css", "javascript"],
-        "data": ["data", "pandas", "numpy", "sql", "analytics"],
-        "mobile": ["android", "ios", "flutter", "react native"]
-    }
-
-    if domain not in domain_keywords:
+def filter_by_domain(
+    request: Request,
+    domain: list[str] = Query(..., description="One or more domains, repeated or comma separated"),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+):
+    domains = sorted({
+        part.strip().lower()
+        for value in domain
+        for part in value.split(",")
+        if part.strip()
+    })
+    if not domains or any(d not in domain_classifier.domains for d in domains):
         raise HTTPException(status_code=400,detail="Invalid domain")
-    keywords = domain_keywords[domain]
-    internships = db.query(models.Internship).all()
 
-    filtered = []
-
-    for job in internships:
-        text = f"{job.title} {job.skills}".lower()
-        if any(k in text for k in keywords):
-            filtered.append(job)
-
-    response = {
-        "count":len(filtered),
-        "data":filtered
-    }
-    request_cache.set(cache_key, response, ttl_seconds=120)
-    return response
+    try:
+        cached = cached_domain_page(domains, cursor, limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return cached_json_response(request, cached)
 
 @router.get("/search")
-def search_internship(q : str = Query(None,description="Search keyword"),db:Session = Depends(get_db)):
-    normalized_q = (q or "").strip().lower()
-    cache_key = f"jobs:search:{normalized_q or '__all__'}"
-    cached = request_cache.get(cache_key)
-    if cached is not None:
-        return cached
-
-    if q:
-        results = (db.query(models.Internship).filter(models.Internship.title.ilike(f"%{q}%")).all())
-    else:
-        results = db.query(models.Internship).all()
-    response = {
-        "data":results
-    }
-    request_cache.set(cache_key, response, ttl_seconds=90)
-    return response
+def search_internship(
+    request: Request,
+    q : str = Query(None,description="Search keyword"),
+    page: int = Query(1, ge=1),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+):
+    normalized_q = normalize_query(q)
+    if page == 1:
+        search_activity.record(normalized_q)
+    cached = cached_search_page(normalized_q, page, limit)
+    return cached_json_response(request, cached)
 
 @router.get("/recommendation")
 def recommend_internship(
-    db: Session = Depends(get_db),
+    request: Request,
     current_user = Depends(get_current_user)
 ):
-    cache_key = f"jobs:recommend:{current_user.id}"
-    cached = request_cache.get(cache_key)
-    if cached is not None:
-        return cached
-
-    profile = db.query(models.UserProfile)\
-        .filter(models.UserProfile.user_id == current_user.id)\
-        .first()
-
-    if not profile:
+    recent_users.record(current_user.id)
+    cached = cached_recommendations(current_user.id)
+    if cached is None:
         return {"error": "Profile not found"}
-
-    user_skills = {
-        skill.strip().lower()
-        for skill in (profile.skills or [])
-        if skill and skill.strip()
-    }
-
-    if not user_skills:
-        request_cache.set(cache_key, [], ttl_seconds=120)
-        return []
-
-    # Fetch only required columns (FASTER)
-    conditions = [models.Internship.skills.ilike(f"%{skill}%") for skill in user_skills if len(skill) >= 2]
-
-    internship_query = db.query(
-        models.Internship.id,
-        models.Internship.title,
-        models.Internship.company,
-        models.Internship.duration,
-        models.Internship.location,
-        models.Internship.link,
-        models.Internship.skills,
-        models.Internship.stipend
-    )
-
-    if conditions:
-        internship_query = internship_query.filter(or_(*conditions))
-
-    internships = internship_query.limit(1200).all()
-
-    recommendations = []
-
-    for internship in internships:
-        required_skills = set(_parse_skill_text(internship.skills or ""))
-
-        if not required_skills:
-            continue
-
-        match_count = len(user_skills & required_skills)
-        match_percentage = int((match_count / len(required_skills)) * 100)
-
-        # 🔥 Only push if some match exists (major performance improvement)
-        if match_percentage > 0:
-            recommendations.append({
-                "id": internship.id,
-                "title": internship.title,
-                "company": internship.company,
-                "duration": internship.duration,
-                "location": internship.location,
-                "link": internship.link,
-                "skills": internship.skills,
-                "stipend": internship.stipend,
-                "match_percentage": match_percentage,
-                "skill_gap": list(required_skills - user_skills)
-            })
-
-    # 🔥 Sort only matched ones
-    recommendations = sorted(
-        recommendations,
-        key=lambda x: x["match_percentage"],
-        reverse=True
-    )
-
-    # 🔥 Limit results (VERY IMPORTANT)
-    top_recommendations = recommendations[:20]
-    request_cache.set(cache_key, top_recommendations, ttl_seconds=180)
-    return top_recommendations
\ No newline at end of file
+    return cached_json_response(request, cached)
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends
+
+from database.database import async_engine, engine
+from database.pool_metrics import pool_stats
+from security import verify_scraper_key
+from services.request_cache import request_cache
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["Metrics"],
+    dependencies=[Depends(verify_scraper_key)]
+)
+
+
+@router.get("/cache")
+def cache_metrics(reset: bool = False):
+    """Request-cache size and per-key-family counters for this worker."""
+    stats = request_cache.stats()
+    if reset:
+        request_cache.metrics.reset()
+    return stats
+
+
+@router.get("/db")
+def db_pool_metrics(reset: bool = False):
+    """Connection pool occupancy and checkout wait times for this worker."""
+    stats = {**pool_stats(engine), "async": pool_stats(async_engine)}
+    if reset:
+        for pool in (engine.pool, async_engine.pool):
+            if getattr(pool, "metrics", None) is not None:
+                pool.metrics.reset()
+    return stats
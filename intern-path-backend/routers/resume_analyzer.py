@@ -1,5 +1,6 @@
 from fastapi import APIRouter, UploadFile, File
 from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 from services.resume_scoring import analyze_resume_text
 from services.pdf_utils import extract_text
 from database.schemas import ResumeAnalysisResponse
@@ -12,7 +13,8 @@ async def analyze_resume(file: UploadFile = File(...)):
 
     file_bytes = await file.read()
     print(f"File size: {len(file_bytes)} bytes", flush=True)
-    text = extract_text(file_bytes)
+    # PDF parsing and scoring are CPU-bound; keep them off the event loop.
+    text = await run_in_threadpool(extract_text, file_bytes)
     print(f"Extracted text length: {len(text) if text else 0}", flush=True)
 
     if not text:
@@ -21,6 +23,6 @@ async def analyze_resume(file: UploadFile = File(...)):
             status_code=400
         )
 
-    result = analyze_resume_text(text)
+    result = await run_in_threadpool(analyze_resume_text, text)
     print(f"Result: {result}", flush=True)
     return result
\ No newline at end of file
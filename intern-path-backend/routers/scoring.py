@@ -1,18 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy import text
-from database.database import SessionLocal
+from dependencies import get_db
 from services.profile_score import score_user_profile
 
 router = APIRouter(prefix="/score", tags=["Scoring"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.get("/{user_id}")
 def score_user(user_id: int, db: Session = Depends(get_db)):
 
@@ -2,22 +2,15 @@ from fastapi import APIRouter,Depends,HTTPException,status
 from sqlalchemy.orm import Session
 from sqlalchemy.orm.attributes import flag_modified
 
-from database import database
 from database.models import UserProfile
 from database.schemas import (
     UserProfileCreate,
     UserProfileOut,
     UserProfileUpdate
 )
-from dependencies import get_current_user
+from dependencies import get_current_user, get_db
 from services.request_cache import request_cache
 
-def get_db():
-    db = database.SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
 router = APIRouter(prefix="/profile",tags=["User Profile"])
 
 @router.post("/",response_model=UserProfileOut,status_code=status.HTTP_201_CREATED)
@@ -48,7 +41,7 @@ def create_user_profile(
     db.add(new_profile)
     db.commit()
     db.refresh(new_profile)
-    request_cache.delete(f"jobs:recommend:{current_user.id}")
+    request_cache.invalidate_tags(f"user:{current_user.id}")
     return new_profile
 
 @router.get("/",response_model=UserProfileOut)
@@ -98,5 +91,5 @@ def update_user_profile(
 
     db.commit()
     db.refresh(db_profile)
-    request_cache.delete(f"jobs:recommend:{current_user.id}")
+    request_cache.invalidate_tags(f"user:{current_user.id}")
     return db_profile
\ No newline at end of file
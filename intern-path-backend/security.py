@@ -1,11 +1,12 @@
 import os
 from datetime import datetime, timedelta, timezone
 from typing import Optional
-from passlib.context import CryptContext
 from jose import jwt, JWTError,ExpiredSignatureError
 from dotenv import load_dotenv
 from fastapi import Header,HTTPException,status
 
+from services.password_pool import PasswordPoolBusy, password_pool
+
 load_dotenv()
 
 # Configuration from Environment Variables
@@ -14,20 +15,23 @@ SCRAPER_API_KEY = os.getenv("SCRAPER_API_KEY")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30  # 24 hours
 
-# --- Password Hashing (Using bcrypt directly) ---
-
-from passlib.context import CryptContext
+# --- Password Hashing (bcrypt in a bounded process pool) ---
 
-pwd_context = CryptContext(
-    schemes=["bcrypt"],
-    deprecated="auto"
-)
+async def _password_pool_call(fn, *args):
+    try:
+        return await fn(*args)
+    except PasswordPoolBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-ins right now, please retry",
+            headers={"Retry-After": "2"},
+        )
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+async def hash_password(password: str) -> str:
+    return await _password_pool_call(password_pool.hash, password)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await _password_pool_call(password_pool.verify, plain_password, hashed_password)
 
 # --- JWT Token Handling ---
 
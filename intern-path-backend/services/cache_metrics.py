@@ -0,0 +1,84 @@
+import threading
+from collections import defaultdict
+
+
+_COUNTERS = (
+    "hits",
+    "stale_hits",
+    "misses",
+    "coalesced",
+    "sets",
+    "evictions",
+    "expirations",
+    "invalidations",
+    # loader results dropped because the key was invalidated mid-computation
+    "discarded",
+    "computes",
+    "compute_errors",
+)
+
+
+def key_family(key: str) -> str:
+    """
+    The prefix a key is reported under: its first two ":" segments, so
+    "jobs:filter:ai:50:first" and "jobs:filter:web:50:first" both count
+    towards "jobs:filter".
+    """
+    return ":".join(key.split(":", 2)[:2])
+
+
+class _FamilyStats:
+    __slots__ = _COUNTERS + ("compute_seconds", "compute_max_seconds")
+
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, 0)
+
+    def as_dict(self) -> dict:
+        stats = {name: getattr(self, name) for name in _COUNTERS}
+        lookups = self.hits + self.stale_hits + self.misses
+        stats["hit_rate"] = round((self.hits + self.stale_hits) / lookups, 4) if lookups else None
+        stats["compute_avg_ms"] = round(self.compute_seconds / self.computes * 1000, 2) if self.computes else None
+        stats["compute_max_ms"] = round(self.compute_max_seconds * 1000, 2)
+        return stats
+
+
+class CacheMetrics:
+    """
+    Thread-safe counters per key family. TTLCache records lookups, sets and
+    loader timings; MemoryBackend records evictions, expirations and
+    invalidations as they happen.
+    """
+
+    def __init__(self):
+        self._families: defaultdict[str, _FamilyStats] = defaultdict(_FamilyStats)
+        self._lock = threading.Lock()
+
+    def record(self, key: str, counter: str, count: int = 1):
+        with self._lock:
+            stats = self._families[key_family(key)]
+            setattr(stats, counter, getattr(stats, counter) + count)
+
+    def record_compute(self, key: str, seconds: float, failed: bool = False):
+        with self._lock:
+            stats = self._families[key_family(key)]
+            stats.computes += 1
+            stats.compute_seconds += seconds
+            stats.compute_max_seconds = max(stats.compute_max_seconds, seconds)
+            if failed:
+                stats.compute_errors += 1
+
+    def snapshot(self) -> dict:
+        """{"families": {family: counters}, "total": counters}, hit rates included."""
+        with self._lock:
+            families = {family: stats.as_dict() for family, stats in sorted(self._families.items())}
+            total = _FamilyStats()
+            for stats in self._families.values():
+                for name in _COUNTERS + ("compute_seconds",):
+                    setattr(total, name, getattr(total, name) + getattr(stats, name))
+                total.compute_max_seconds = max(total.compute_max_seconds, stats.compute_max_seconds)
+        return {"families": families, "total": total.as_dict()}
+
+    def reset(self):
+        with self._lock:
+            self._families.clear()
@@ -0,0 +1,154 @@
+import json
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from services.domains import domain_classifier
+from services.listings import (
+    cached_domain_page,
+    cached_listing_page,
+    cached_recommendations,
+    cached_search_page,
+)
+from services.pagination import DEFAULT_PAGE_SIZE
+
+
+CACHE_WARM_ON_STARTUP = os.getenv("CACHE_WARM_ON_STARTUP", "1") == "1"
+# Pause between two warm-up queries, so live requests keep the pool and the CPU.
+CACHE_WARM_DELAY_SECONDS = float(os.getenv("CACHE_WARM_DELAY_SECONDS", "0.2"))
+CACHE_WARM_LIST_PAGES = int(os.getenv("CACHE_WARM_LIST_PAGES", "3"))
+CACHE_WARM_SEARCH_TERMS = int(os.getenv("CACHE_WARM_SEARCH_TERMS", "20"))
+CACHE_WARM_RECENT_USERS = int(os.getenv("CACHE_WARM_RECENT_USERS", "50"))
+
+
+class SearchActivity:
+    """Counts normalized search queries; bounded by halving counts when full."""
+
+    def __init__(self, max_terms: int = 5000):
+        self.max_terms = max_terms
+        self._counts: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, normalized_q: str):
+        if not normalized_q:
+            return
+        with self._lock:
+            self._counts[normalized_q] += 1
+            if len(self._counts) > self.max_terms:
+                self._counts = Counter({
+                    term: count // 2
+                    for term, count in self._counts.items()
+                    if count > 1
+                })
+
+    def popular(self, n: int) -> list[str]:
+        with self._lock:
+            return [term for term, _ in self._counts.most_common(n)]
+
+
+class RecentUsers:
+    """The most recently active user ids, newest first."""
+
+    def __init__(self, max_users: int = 1000):
+        self.max_users = max_users
+        self._seen: OrderedDict[int, None] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, user_id: int):
+        with self._lock:
+            self._seen[user_id] = None
+            self._seen.move_to_end(user_id)
+            while len(self._seen) > self.max_users:
+                self._seen.popitem(last=False)
+
+    def latest(self, n: int) -> list[int]:
+        with self._lock:
+            return list(reversed(self._seen))[:n]
+
+
+search_activity = SearchActivity()
+recent_users = RecentUsers()
+
+
+class CacheWarmer:
+    """
+    Refills the request cache in a daemon thread: the first listing pages,
+    every domain filter, the most searched terms and the recommendations of
+    recently active users. One query at a time with a pause in between;
+    entries that are already fresh cost nothing (get_or_compute).
+
+    schedule() never blocks. If a warm-up is already running it is run
+    once more afterwards, since the invalidation that triggered the call
+    may have dropped entries it had already filled.
+    """
+
+    def __init__(
+        self,
+        delay_seconds: float = CACHE_WARM_DELAY_SECONDS,
+        list_pages: int = CACHE_WARM_LIST_PAGES,
+        search_terms: int = CACHE_WARM_SEARCH_TERMS,
+        recent_user_count: int = CACHE_WARM_RECENT_USERS,
+    ):
+        self.delay_seconds = delay_seconds
+        self.list_pages = list_pages
+        self.search_terms = search_terms
+        self.recent_user_count = recent_user_count
+        self._lock = threading.Lock()
+        self._running = False
+        self._pending = False
+
+    def schedule(self, reason: str = ""):
+        with self._lock:
+            if self._running:
+                self._pending = True
+                return
+            self._running = True
+        threading.Thread(target=self._run, args=(reason,), name="cache-warmer", daemon=True).start()
+
+    def _run(self, reason: str):
+        while True:
+            try:
+                self.warm(reason)
+            except Exception as e:
+                print(f"Cache warm-up failed: {e}")
+            with self._lock:
+                if not self._pending:
+                    self._running = False
+                    return
+                self._pending = False
+                reason = "rerun"
+
+    def warm(self, reason: str = "") -> int:
+        """Runs the whole warm-up in the calling thread; returns how many entries it touched."""
+        started = time.perf_counter()
+        warmed = 0
+
+        def step(load, *args):
+            nonlocal warmed
+            cached = load(*args)
+            warmed += 1
+            time.sleep(self.delay_seconds)
+            return cached
+
+        cursor = None
+        for _ in range(self.list_pages):
+            cached = step(cached_listing_page, cursor, DEFAULT_PAGE_SIZE)
+            cursor = json.loads(cached.body)["next_cursor"]
+            if not cursor:
+                break
+
+        for domain in domain_classifier.domains:
+            step(cached_domain_page, [domain], None, DEFAULT_PAGE_SIZE)
+
+        for term in search_activity.popular(self.search_terms):
+            step(cached_search_page, term, 1, DEFAULT_PAGE_SIZE)
+
+        for user_id in recent_users.latest(self.recent_user_count):
+            step(cached_recommendations, user_id)
+
+        print(f"Cache warm-up ({reason or 'manual'}): {warmed} entries in {time.perf_counter() - started:.1f}s")
+        return warmed
+
+
+cache_warmer = CacheWarmer()
@@ -0,0 +1,63 @@
+import gzip
+import hashlib
+import json
+from dataclasses import dataclass
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+
+# Same threshold as the GZipMiddleware in main.py.
+GZIP_MIN_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """A JSON payload serialized once, with its gzip variant and ETag."""
+    body: bytes
+    gzip_body: bytes | None
+    etag: str
+
+    @property
+    def gzip_etag(self) -> str:
+        # Each encoding is its own representation, so it gets its own strong validator.
+        return self.etag[:-1] + '-gzip"'
+
+
+def build_cached_response(payload) -> CachedResponse:
+    body = json.dumps(
+        jsonable_encoder(payload),
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+    etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+    gzip_body = gzip.compress(body, compresslevel=6) if len(body) >= GZIP_MIN_SIZE else None
+    return CachedResponse(body=body, gzip_body=gzip_body, etag=etag)
+
+
+def _etag_matches(if_none_match: str, cached: CachedResponse) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return cached.etag in candidates or cached.gzip_etag in candidates
+
+
+def cached_json_response(request: Request, cached: CachedResponse) -> Response:
+    """
+    Serves the stored bytes as-is: 304 when the client already has them,
+    the pre-compressed body when it accepts gzip, the plain body otherwise.
+    """
+    use_gzip = cached.gzip_body is not None and "gzip" in request.headers.get("accept-encoding", "")
+    etag = cached.gzip_etag if use_gzip else cached.etag
+    headers = {"ETag": etag, "Vary": "Accept-Encoding"}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, cached):
+        return Response(status_code=304, headers=headers)
+
+    if use_gzip:
+        # GZipMiddleware leaves responses that already carry Content-Encoding alone.
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=cached.gzip_body, media_type="application/json", headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
@@ -0,0 +1,143 @@
+import json
+import os
+import re
+
+from database import models
+
+
+# Override with DOMAIN_TAXONOMY_PATH pointing to a JSON file of the same shape.
+# Keywords of MIN_SUFFIX_KEYWORD_LENGTH+ characters also match with a suffix
+# ("web" -> "website", "react" -> "reactjs", "sql" -> "sqlite"); shorter ones
+# ("ai", "ml") only as whole words.
+DEFAULT_TAXONOMY = {
+    "ai": ["ai", "artificial intelligence", "ml", "machine learning", "llm", "nlp"],
+    "web": ["web", "frontend", "backend", "full stack", "react", "django", "html", "css", "javascript", "node"],
+    "data": ["data", "pandas", "numpy", "sql", "mysql", "postgres", "nosql", "mongodb", "analytics"],
+    "mobile": ["android", "ios", "flutter", "react native"]
+}
+
+
+def load_taxonomy() -> dict[str, list[str]]:
+    path = os.getenv("DOMAIN_TAXONOMY_PATH")
+    if not path:
+        return DEFAULT_TAXONOMY
+    with open(path, encoding="utf-8") as f:
+        taxonomy = json.load(f)
+    return {
+        domain.strip().lower(): [keyword.strip().lower() for keyword in keywords if keyword.strip()]
+        for domain, keywords in taxonomy.items()
+    }
+
+
+MIN_SUFFIX_KEYWORD_LENGTH = 3
+
+
+def _alternation(keywords) -> str:
+    return "|".join(re.escape(keyword) for keyword in sorted(keywords, key=len, reverse=True))
+
+
+class DomainClassifier:
+    """
+    All taxonomy keywords compiled into one alternation that starts at a
+    word boundary, so a listing is classified in a single pass over its text.
+    """
+
+    def __init__(self, taxonomy: dict[str, list[str]]):
+        self.domains = frozenset(taxonomy)
+
+        keyword_domains: dict[str, set[str]] = {}
+        for domain, keywords in taxonomy.items():
+            for keyword in keywords:
+                keyword_domains.setdefault(keyword, set()).add(domain)
+
+        # The regex consumes the longest keyword at each position, so a
+        # longer keyword also inherits the domains of keywords inside it
+        # ("react native" is mobile and web, like "react" alone).
+        for keyword, domains in keyword_domains.items():
+            for other, other_domains in keyword_domains.items():
+                if other != keyword and re.search(rf"\b{re.escape(other)}\b", keyword):
+                    domains |= other_domains
+
+        self._keyword_domains = {keyword: frozenset(domains) for keyword, domains in keyword_domains.items()}
+        stems = [keyword for keyword in keyword_domains if len(keyword) >= MIN_SUFFIX_KEYWORD_LENGTH]
+        words = [keyword for keyword in keyword_domains if len(keyword) < MIN_SUFFIX_KEYWORD_LENGTH]
+        branches = []
+        if stems:
+            branches.append(rf"(?P<stem>{_alternation(stems)})\w*")
+        if words:
+            branches.append(rf"(?P<word>{_alternation(words)})\b")
+        self._pattern = re.compile(rf"\b(?:{'|'.join(branches)})")
+
+    def classify(self, title: str | None, skills: str | None) -> set[str]:
+        text = f"{title or ''} {skills or ''}".lower()
+        found: set[str] = set()
+        for match in self._pattern.finditer(text):
+            found |= self._keyword_domains[match.group(match.lastgroup)]
+            if len(found) == len(self.domains):
+                break
+        return found
+
+
+domain_classifier = DomainClassifier(load_taxonomy())
+
+
+def classify_internships(db, internships) -> set[str]:
+    """
+    Replaces the stored domains of `internships` and returns every domain
+    they were in before or after, i.e. the filters this change touches.
+    Caller commits.
+    """
+    internships = list(internships)
+    if not internships:
+        return set()
+
+    ids = [internship.id for internship in internships]
+    previous = db.query(models.InternshipDomain.domain)\
+        .filter(models.InternshipDomain.internship_id.in_(ids))\
+        .distinct()\
+        .all()
+    db.query(models.InternshipDomain)\
+        .filter(models.InternshipDomain.internship_id.in_(ids))\
+        .delete(synchronize_session=False)
+
+    affected = {row.domain for row in previous}
+    for internship in internships:
+        for domain in domain_classifier.classify(internship.title, internship.skills):
+            db.add(models.InternshipDomain(internship_id=internship.id, domain=domain))
+            affected.add(domain)
+    return affected
+
+
+def reclassify_all(db, batch_size: int = 2000):
+    """Backfill, or re-run after editing the taxonomy."""
+    last_id = 0
+    while True:
+        batch = db.query(
+            models.Internship.id,
+            models.Internship.title,
+            models.Internship.skills
+        ).filter(models.Internship.id > last_id)\
+            .order_by(models.Internship.id)\
+            .limit(batch_size)\
+            .all()
+        if not batch:
+            break
+        classify_internships(db, batch)
+        db.commit()
+        last_id = batch[-1].id
+
+
+def backfill_domains(db):
+    if db.query(models.InternshipDomain.internship_id).first() is None:
+        reclassify_all(db)
+
+
+if __name__ == "__main__":
+    from database.database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        reclassify_all(session)
+        print("Internship domains reclassified")
+    finally:
+        session.close()
@@ -0,0 +1,137 @@
+import base64
+import json
+import os
+import re
+import threading
+import time
+
+import httpx
+from google.auth import jwt
+
+
+GOOGLE_CERTS_URL = os.getenv("GOOGLE_CERTS_URL", "https://www.googleapis.com/oauth2/v1/certs")
+# Used when the response carries no usable Cache-Control max-age.
+GOOGLE_CERTS_DEFAULT_MAX_AGE = int(os.getenv("GOOGLE_CERTS_DEFAULT_MAX_AGE", "3600"))
+# Refresh in the background once this fraction of the lifetime has passed.
+GOOGLE_CERTS_REFRESH_AT = 0.8
+# An unknown key id forces a refetch, but never more often than this.
+GOOGLE_CERTS_MIN_REFETCH_SECONDS = 30
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+
+_MAX_AGE = re.compile(r"(?:^|,)\s*max-age\s*=\s*(\d+)", re.IGNORECASE)
+
+
+def cache_lifetime(headers) -> int:
+    """Seconds the response may be reused: Cache-Control max-age minus Age."""
+    cache_control = headers.get("cache-control", "")
+    if "no-store" in cache_control.lower() or "no-cache" in cache_control.lower():
+        return 0
+    match = _MAX_AGE.search(cache_control)
+    if not match:
+        return GOOGLE_CERTS_DEFAULT_MAX_AGE
+    try:
+        age = int(headers.get("age", "0"))
+    except ValueError:
+        age = 0
+    return max(0, int(match.group(1)) - age)
+
+
+def _token_key_id(token: str | bytes) -> str | None:
+    if isinstance(token, bytes):
+        token = token.decode("ascii", errors="replace")
+    header_segment = token.split(".", 1)[0]
+    try:
+        header = json.loads(base64.urlsafe_b64decode(header_segment + "=" * (-len(header_segment) % 4)))
+    except ValueError:
+        return None
+    return header.get("kid") if isinstance(header, dict) else None
+
+
+class GoogleCertCache:
+    """
+    Google's ID-token signing certificates, fetched over one pooled client
+    and kept for as long as the endpoint's Cache-Control allows. Past
+    GOOGLE_CERTS_REFRESH_AT of that lifetime a background thread refetches,
+    so requests keep verifying against the current set without waiting.
+    Only the first call, an expired set or an unknown key id (rotation)
+    fetch inline.
+    """
+
+    def __init__(
+        self,
+        certs_url: str = GOOGLE_CERTS_URL,
+        transport: httpx.BaseTransport | None = None,
+        timeout: float = 10,
+    ):
+        self.certs_url = certs_url
+        self._client = httpx.Client(timeout=timeout, transport=transport)
+        self._certs: dict[str, str] = {}
+        self._fetched_at = 0.0
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def _fetch(self):
+        response = self._client.get(self.certs_url)
+        response.raise_for_status()
+        certs = response.json()
+        now = time.monotonic()
+        self._certs = certs
+        self._fetched_at = now
+        self._expires_at = now + cache_lifetime(response.headers)
+
+    def _refresh_soon(self) -> bool:
+        lifetime = self._expires_at - self._fetched_at
+        return time.monotonic() >= self._fetched_at + lifetime * GOOGLE_CERTS_REFRESH_AT
+
+    def get(self) -> dict[str, str]:
+        now = time.monotonic()
+        if now >= self._expires_at:
+            with self._lock:
+                if time.monotonic() >= self._expires_at:
+                    self._fetch()
+        elif self._refresh_soon():
+            self._refresh_in_background()
+        return self._certs
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def refresh():
+            try:
+                with self._lock:
+                    self._fetch()
+            except Exception as e:
+                # Keep serving the current set until it actually expires.
+                print(f"Google certificate refresh failed: {e}")
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=refresh, name="google-certs-refresh", daemon=True).start()
+
+    def get_for_key(self, key_id: str | None) -> dict[str, str]:
+        """Like get(), but refetches once if Google has rotated in a key we haven't seen."""
+        certs = self.get()
+        if key_id is None or key_id in certs:
+            return certs
+        with self._lock:
+            if key_id not in self._certs and time.monotonic() - self._fetched_at >= GOOGLE_CERTS_MIN_REFETCH_SECONDS:
+                self._fetch()
+            return self._certs
+
+    def verify_id_token(self, token: str | bytes, audience: str | None = None, clock_skew_in_seconds: int = 0) -> dict:
+        """
+        Local equivalent of google.oauth2.id_token.verify_oauth2_token.
+        Raises ValueError for a bad signature, audience, expiry or issuer.
+        """
+        certs = self.get_for_key(_token_key_id(token))
+        claims = jwt.decode(token, certs=certs, audience=audience, clock_skew_in_seconds=clock_skew_in_seconds)
+        if claims.get("iss") not in GOOGLE_ISSUERS:
+            raise ValueError(f"Wrong issuer. 'iss' should be one of {GOOGLE_ISSUERS}")
+        return claims
+
+
+google_cert_cache = GoogleCertCache()
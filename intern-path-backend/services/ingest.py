@@ -0,0 +1,145 @@
+import os
+import uuid
+from datetime import date, datetime
+
+from sqlalchemy import or_
+
+from database import models
+from database.database import SessionLocal
+from database.dialects import insert_for
+from services.cache_warmer import cache_warmer
+from services.domains import classify_internships
+from services.request_cache import request_cache
+from services.scraper import save_crawl_state, scrape_listings
+from services.skill_catalog import sync_internship_skills
+from services.skill_index import skill_index
+
+
+INGEST_CHUNK_SIZE = int(os.getenv("INGEST_CHUNK_SIZE", "500"))
+
+_CONTENT_FIELDS = ("title", "company", "source", "keyword", "location", "duration", "stipend", "skills")
+# Written along with a content change, but not a change by itself: scraped_date
+# is when the current content was scraped, and re-stamping unchanged rows
+# would turn every weekly run into a full-table write.
+_UPDATED_FIELDS = _CONTENT_FIELDS + ("scraped_date",)
+_RETURNED_FIELDS = ("id", "title", "company", "duration", "location", "link", "skills", "stipend")
+
+
+def _clip(field: str, value):
+    length = getattr(models.Internship.__table__.c[field].type, "length", None)
+    if isinstance(value, str):
+        value = value.strip()
+        if length:
+            value = value[:length]
+    return value
+
+
+def _normalize(listing: dict) -> dict:
+    row = {field: _clip(field, listing.get(field)) for field in _CONTENT_FIELDS}
+    row["link"] = listing["link"].strip()
+    row["scraped_date"] = listing.get("scraped_date") or date.today()
+    return row
+
+
+def upsert_internships(db, listings) -> dict:
+    """
+    INSERT ... ON CONFLICT (link) DO UPDATE in chunks of INGEST_CHUNK_SIZE,
+    one transaction per chunk. Rows whose content did not change are left
+    alone, so they cost no write and invalidate nothing.
+    """
+    by_link = {}
+    for listing in listings:
+        row = _normalize(listing)
+        if row["link"]:
+            # Postgres refuses to touch the same row twice in one statement.
+            by_link[row["link"]] = row
+    rows = list(by_link.values())
+
+    insert = insert_for(db.get_bind())
+    table = models.Internship.__table__
+    upserted = 0
+    affected_domains: set[str] = set()
+
+    try:
+        for start in range(0, len(rows), INGEST_CHUNK_SIZE):
+            chunk = rows[start:start + INGEST_CHUNK_SIZE]
+            stmt = insert(table).values(chunk)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["link"],
+                set_={field: stmt.excluded[field] for field in _UPDATED_FIELDS},
+                where=or_(*(table.c[field].is_distinct_from(stmt.excluded[field]) for field in _CONTENT_FIELDS))
+            ).returning(*(table.c[field] for field in _RETURNED_FIELDS))
+
+            try:
+                changed = db.execute(stmt).all()
+                skill_ids = sync_internship_skills(db, changed)
+                affected_domains |= classify_internships(db, changed)
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+
+            skill_index.upsert(changed, skill_ids)
+            upserted += len(changed)
+    finally:
+        # Also when a later chunk fails: the earlier ones are already committed.
+        if upserted:
+            invalidate_listing_caches(affected_domains)
+
+    return {"received": len(rows), "upserted": upserted}
+
+
+def invalidate_listing_caches(affected_domains: set[str]):
+    request_cache.invalidate_tags(
+        "jobs:list",
+        "jobs:search",
+        "jobs:recommend",
+        *(f"jobs:filter:{domain}" for domain in affected_domains)
+    )
+
+
+def create_ingest_job(db) -> models.IngestJob:
+    job = models.IngestJob(id=uuid.uuid4().hex, status="queued")
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def run_ingest_job(job_id: str, listings: list[dict] | None = None):
+    """
+    Background entry point; owns its session and records the outcome on
+    the job row. Without listings it scrapes the configured sources.
+    """
+    db = SessionLocal()
+    try:
+        job = db.get(models.IngestJob, job_id)
+        job.status = "running"
+        db.commit()
+
+        try:
+            if listings is not None:
+                result = upsert_internships(db, listings)
+            else:
+                scraped = scrape_listings(db)
+                print(f"Ingest job {job_id}: {scraped.unchanged_pages} of {len(scraped.crawl_state)} pages unchanged")
+                result = upsert_internships(db, scraped.listings)
+                save_crawl_state(db, scraped.crawl_state)
+        except Exception as e:
+            print(f"Ingest job {job_id} failed: {e}")
+            # The failed statement may have left the transaction aborted (Postgres).
+            db.rollback()
+            job = db.get(models.IngestJob, job_id)
+            job.status = "failed"
+            job.error = str(e)
+        else:
+            job.status = "succeeded"
+            job.received = result["received"]
+            job.upserted = result["upserted"]
+        job.finished_at = datetime.utcnow()
+        db.commit()
+
+        if job.upserted:
+            cache_warmer.schedule(f"ingest {job_id}")
+    finally:
+        db.close()
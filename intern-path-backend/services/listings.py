@@ -0,0 +1,167 @@
+from database import models, database
+from database.schemas import InternshipOut
+from services.cached_response import CachedResponse, build_cached_response
+from services.pagination import keyset_page
+from services.request_cache import request_cache
+from services.search import get_search_backend
+from services.skill_index import skill_index
+
+
+search_backend = get_search_backend(database.engine)
+
+# Only what InternshipOut exposes, plus id for the keyset cursor.
+LISTING_COLUMNS = [models.Internship.id] + [
+    getattr(models.Internship, field) for field in InternshipOut.model_fields
+]
+
+# Stale entries are served for this long while one refresh runs.
+STALE_TTL_SECONDS = 60
+
+
+def _cached_loader(compute, *args):
+    """
+    Loader for request_cache.get_or_compute: runs `compute` on its own
+    session (it may finish after the request, as a background refresh)
+    and serializes the result once. A None result stays None.
+    """
+    def load():
+        with database.SessionLocal() as db:
+            result = compute(db, *args)
+        return build_cached_response(result) if result is not None else None
+    return load
+
+
+def _listing_page(db, cursor, limit):
+    query = db.query(*LISTING_COLUMNS)
+    rows, next_cursor = keyset_page(query, models.Internship.id, cursor, limit)
+    return {
+        "data": [dict(row._mapping) for row in rows],
+        "next_cursor": next_cursor
+    }
+
+
+def _domain_page(db, domains, cursor, limit):
+    # Domains are assigned at ingest time; this is an index lookup on internship_domains.
+    matching_ids = db.query(models.InternshipDomain.internship_id)\
+        .filter(models.InternshipDomain.domain.in_(domains))
+    total = matching_ids.distinct().count()
+
+    query = db.query(*LISTING_COLUMNS).filter(models.Internship.id.in_(matching_ids))
+    rows, next_cursor = keyset_page(query, models.Internship.id, cursor, limit)
+    return {
+        "count":total,
+        "data":[dict(row._mapping) for row in rows],
+        "next_cursor":next_cursor
+    }
+
+
+def _search_page(db, normalized_q, page, limit):
+    offset = (page - 1) * limit
+    if normalized_q:
+        # One extra id tells us whether there is a next page.
+        ids = search_backend.search(db, normalized_q, limit + 1, offset)
+        rows = db.query(*LISTING_COLUMNS).filter(models.Internship.id.in_(ids[:limit])).all()
+        rank = {internship_id: position for position, internship_id in enumerate(ids)}
+        rows.sort(key=lambda row: rank[row.id])
+        has_more = len(ids) > limit
+    else:
+        # No query: newest listings, never the whole table.
+        rows = db.query(*LISTING_COLUMNS)\
+            .order_by(models.Internship.id.desc())\
+            .offset(offset)\
+            .limit(limit + 1)\
+            .all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+    return {
+        "data":[dict(row._mapping) for row in rows],
+        "page":page,
+        "has_more":has_more
+    }
+
+
+def _recommendations(db, user_id):
+    profile = db.query(models.UserProfile)\
+        .filter(models.UserProfile.user_id == user_id)\
+        .first()
+
+    if not profile:
+        return None
+
+    user_skills = {
+        skill.strip().lower()
+        for skill in (profile.skills or [])
+        if skill and skill.strip()
+    }
+
+    if not user_skills:
+        return []
+
+    # Posting-list intersection over the in-memory skill index; no table scan.
+    skill_index.ensure_built(db)
+    return skill_index.recommend(user_skills, limit=20)
+
+
+def normalize_query(q: str | None) -> str:
+    return " ".join((q or "").lower().split())
+
+
+# Each cached_* function owns its key, TTL and tags, so the routers and the
+# cache warmer always read and fill the same entries. Invalid cursors raise
+# ValueError.
+
+_LISTING_TTL_SECONDS = 120
+_LISTING_TAGS = ("jobs", "jobs:list")
+
+
+def cached_listing_page(cursor: str | None, limit: int) -> CachedResponse:
+    return request_cache.get_or_compute(
+        f"jobs:list:{limit}:{cursor or 'first'}",
+        _cached_loader(_listing_page, cursor, limit),
+        ttl_seconds=_LISTING_TTL_SECONDS,
+        tags=_LISTING_TAGS,
+        stale_ttl_seconds=STALE_TTL_SECONDS
+    )
+
+
+async def acached_listing_page(cursor: str | None, limit: int) -> CachedResponse:
+    """Same entry as cached_listing_page(); the query runs in a worker thread."""
+    return await request_cache.aget_or_compute(
+        f"jobs:list:{limit}:{cursor or 'first'}",
+        _cached_loader(_listing_page, cursor, limit),
+        ttl_seconds=_LISTING_TTL_SECONDS,
+        tags=_LISTING_TAGS,
+        stale_ttl_seconds=STALE_TTL_SECONDS
+    )
+
+
+def cached_domain_page(domains: list[str], cursor: str | None, limit: int) -> CachedResponse:
+    """`domains` must be sorted and validated against domain_classifier.domains."""
+    return request_cache.get_or_compute(
+        f"jobs:filter:{','.join(domains)}:{limit}:{cursor or 'first'}",
+        _cached_loader(_domain_page, domains, cursor, limit),
+        ttl_seconds=120,
+        tags=("jobs", "jobs:filter", *(f"jobs:filter:{d}" for d in domains)),
+        stale_ttl_seconds=STALE_TTL_SECONDS
+    )
+
+
+def cached_search_page(normalized_q: str, page: int, limit: int) -> CachedResponse:
+    return request_cache.get_or_compute(
+        f"jobs:search:{normalized_q or '__all__'}:{page}:{limit}",
+        _cached_loader(_search_page, normalized_q, page, limit),
+        ttl_seconds=90,
+        tags=("jobs", "jobs:search"),
+        stale_ttl_seconds=STALE_TTL_SECONDS
+    )
+
+
+def cached_recommendations(user_id: int) -> CachedResponse | None:
+    """None when the user has no profile yet; that answer is not cached."""
+    return request_cache.get_or_compute(
+        f"jobs:recommend:{user_id}",
+        _cached_loader(_recommendations, user_id),
+        ttl_seconds=180,
+        tags=("jobs", "jobs:recommend", f"user:{user_id}")
+    )
@@ -0,0 +1,49 @@
+import base64
+import binascii
+import json
+import os
+
+
+DEFAULT_PAGE_SIZE = int(os.getenv("JOBS_PAGE_SIZE", "50"))
+MAX_PAGE_SIZE = int(os.getenv("JOBS_MAX_PAGE_SIZE", "200"))
+
+_CURSOR_VERSION = 1
+
+
+def encode_cursor(last_id: int) -> str:
+    """Opaque, url-safe cursor pointing just past `last_id` (ids are listed newest first)."""
+    raw = json.dumps({"v": _CURSOR_VERSION, "id": last_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Raises ValueError for anything that was not produced by encode_cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError("Malformed cursor") from e
+
+    if not isinstance(payload, dict) or payload.get("v") != _CURSOR_VERSION:
+        raise ValueError("Unsupported cursor version")
+    last_id = payload.get("id")
+    if not isinstance(last_id, int):
+        raise ValueError("Malformed cursor")
+    return last_id
+
+
+def keyset_page(query, id_column, cursor: str | None, limit: int):
+    """
+    Applies `id < cursor ORDER BY id DESC LIMIT limit + 1` to `query` and
+    returns (rows, next_cursor). The extra row only tells us whether
+    another page exists.
+    """
+    if cursor:
+        query = query.filter(id_column < decode_cursor(cursor))
+
+    rows = query.order_by(id_column.desc()).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].id)
@@ -0,0 +1,140 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from passlib.context import CryptContext
+
+
+# bcrypt is pure CPU; keep it off the request threads and cap how much of the box it gets.
+PASSWORD_POOL_WORKERS = int(os.getenv("PASSWORD_POOL_WORKERS", str(min(2, os.cpu_count() or 1))))
+# Hashes allowed to wait for a worker before new ones are turned away.
+PASSWORD_POOL_QUEUE = int(os.getenv("PASSWORD_POOL_QUEUE", "32"))
+PASSWORD_POOL_QUEUE_TIMEOUT_SECONDS = float(os.getenv("PASSWORD_POOL_QUEUE_TIMEOUT_SECONDS", "2"))
+PASSWORD_POOL_TIMEOUT_SECONDS = float(os.getenv("PASSWORD_POOL_TIMEOUT_SECONDS", "10"))
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto"
+)
+
+
+class PasswordPoolBusy(RuntimeError):
+    """The pool is saturated or a hash took too long; the caller should retry later."""
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+class PasswordPool:
+    """
+    Runs bcrypt in `workers` spawned processes, one call per worker at a
+    time; at most `queue` more wait for a worker. A caller that finds the
+    queue full, cannot get a worker within `queue_timeout` seconds, or whose
+    hash does not finish within `timeout`, gets PasswordPoolBusy. With
+    workers=0 hashing runs in a worker thread.
+
+    Callers queue on an asyncio.Semaphore and await the worker's future,
+    so a login waiting for bcrypt holds neither a thread nor a DB connection.
+
+    Workers are spawned, so a script (not uvicorn) that ends up hashing
+    needs the usual `if __name__ == "__main__":` guard.
+    """
+
+    def __init__(
+        self,
+        workers: int = PASSWORD_POOL_WORKERS,
+        queue: int = PASSWORD_POOL_QUEUE,
+        queue_timeout: float = PASSWORD_POOL_QUEUE_TIMEOUT_SECONDS,
+        timeout: float = PASSWORD_POOL_TIMEOUT_SECONDS,
+    ):
+        self.workers = workers
+        self.queue_timeout = queue_timeout
+        self.timeout = timeout
+        self.queue = queue
+        self._waiting = 0
+        # asyncio primitives belong to one loop; made on first use in each.
+        self._slots: dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a process that already runs cache/sweeper threads is unsafe.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def _reset_executor(self, broken: ProcessPoolExecutor):
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def _loop_slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            slots = self._slots.get(loop)
+            if slots is None:
+                for stale in [other for other in self._slots if other.is_closed()]:
+                    del self._slots[stale]
+                slots = self._slots[loop] = asyncio.Semaphore(self.workers)
+            return slots
+
+    async def run(self, fn, *args):
+        if self.workers <= 0:
+            return await asyncio.to_thread(fn, *args)
+
+        slots = self._loop_slots()
+        if slots.locked():
+            if self._waiting >= self.queue:
+                raise PasswordPoolBusy("password hashing queue is full")
+            self._waiting += 1
+            try:
+                await asyncio.wait_for(slots.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                raise PasswordPoolBusy("password hashing queue is full")
+            finally:
+                self._waiting -= 1
+        else:
+            await slots.acquire()
+        try:
+            for attempt in range(2):
+                executor = self._get_executor()
+                try:
+                    future = executor.submit(fn, *args)
+                    return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+                except BrokenProcessPool:
+                    # A worker died (OOM kill, ...); start a fresh pool once.
+                    self._reset_executor(executor)
+                    if attempt:
+                        raise
+                except asyncio.TimeoutError:
+                    raise PasswordPoolBusy("password hashing timed out")
+        finally:
+            slots.release()
+
+    async def hash(self, password: str) -> str:
+        return await self.run(_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self.run(_verify, plain_password, hashed_password)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+password_pool = PasswordPool()
@@ -0,0 +1,119 @@
+import hashlib
+import os
+import secrets
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException, status
+
+from database import models
+
+
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
+# Spent/revoked rows are kept this long so a replayed token is still
+# recognised as reuse (and revokes its family), then deleted.
+REFRESH_TOKEN_REVOKED_RETENTION_DAYS = int(os.getenv("REFRESH_TOKEN_REVOKED_RETENTION_DAYS", "7"))
+# Full-table purge of expired rows, at most this often per process.
+REFRESH_TOKEN_PURGE_INTERVAL_SECONDS = int(os.getenv("REFRESH_TOKEN_PURGE_INTERVAL_SECONDS", "3600"))
+
+_last_purge = 0.0
+
+
+def _hash_token(token: str) -> str:
+    # The token is 256 random bits, so a fast hash is enough; no bcrypt needed.
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def issue_refresh_token(db, user_id: int, family_id: str | None = None) -> str:
+    """Stores the hash of a new refresh token and returns the token; the caller commits."""
+    token = secrets.token_urlsafe(32)
+    db.add(models.RefreshToken(
+        user_id=user_id,
+        token_hash=_hash_token(token),
+        family_id=family_id or uuid.uuid4().hex,
+        expires_at=datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    ))
+    return token
+
+
+def revoke_family(db, family_id: str):
+    db.query(models.RefreshToken)\
+        .filter(models.RefreshToken.family_id == family_id, models.RefreshToken.revoked_at.is_(None))\
+        .update({models.RefreshToken.revoked_at: datetime.utcnow()}, synchronize_session=False)
+
+
+def _dead_rows(db, now: datetime):
+    return db.query(models.RefreshToken).filter(
+        (models.RefreshToken.expires_at < now)
+        | (models.RefreshToken.revoked_at < now - timedelta(days=REFRESH_TOKEN_REVOKED_RETENTION_DAYS))
+    )
+
+
+def purge_refresh_tokens(db) -> int:
+    """Deletes expired rows and rows revoked longer than the retention window; commits."""
+    global _last_purge
+    _last_purge = time.monotonic()
+    deleted = _dead_rows(db, datetime.utcnow()).delete(synchronize_session=False)
+    db.commit()
+    return deleted
+
+
+def _maybe_purge(db):
+    if time.monotonic() - _last_purge >= REFRESH_TOKEN_PURGE_INTERVAL_SECONDS:
+        try:
+            purge_refresh_tokens(db)
+        except Exception as e:
+            db.rollback()
+            print(f"Refresh token purge failed: {e}")
+
+
+def rotate_refresh_token(db, token: str) -> tuple[int, str]:
+    """
+    Spends `token` and returns (user_id, new refresh token) in the same
+    family. A token that was already spent means it leaked: the whole family
+    is revoked and the caller has to log in again.
+    """
+    stored = db.query(models.RefreshToken)\
+        .filter(models.RefreshToken.token_hash == _hash_token(token))\
+        .first()
+    now = datetime.utcnow()
+
+    if stored is None or stored.expires_at < now:
+        raise _unauthorized("Invalid or expired refresh token")
+
+    # Conditional update, so two concurrent refreshes cannot both spend it.
+    spent = db.query(models.RefreshToken)\
+        .filter(models.RefreshToken.id == stored.id, models.RefreshToken.revoked_at.is_(None))\
+        .update({models.RefreshToken.revoked_at: now}, synchronize_session=False)
+    if not spent:
+        revoke_family(db, stored.family_id)
+        db.commit()
+        raise _unauthorized("Refresh token reused; please log in again")
+
+    # A long-lived session rotates every few minutes; drop its dead links as it goes.
+    _dead_rows(db, now)\
+        .filter(models.RefreshToken.family_id == stored.family_id)\
+        .delete(synchronize_session=False)
+    new_token = issue_refresh_token(db, stored.user_id, stored.family_id)
+    db.commit()
+    _maybe_purge(db)
+    return stored.user_id, new_token
+
+
+def revoke_refresh_token(db, token: str):
+    """Logs the session out: the token and everything rotated from its login."""
+    stored = db.query(models.RefreshToken)\
+        .filter(models.RefreshToken.token_hash == _hash_token(token))\
+        .first()
+    if stored is not None:
+        revoke_family(db, stored.family_id)
+        db.commit()
@@ -1,12 +1,134 @@
+import asyncio
+import heapq
+import inspect
+import os
+import pickle
+import sys
 import threading
 import time
-from typing import Any
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable
 
+from services.cache_metrics import CacheMetrics
 
-class TTLCache:
-    def __init__(self):
-        self._store: dict[str, tuple[float, Any]] = {}
+
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(128 * 1024 * 1024)))
+CACHE_SWEEP_INTERVAL_SECONDS = float(os.getenv("CACHE_SWEEP_INTERVAL_SECONDS", "30"))
+# redis://host:6379/0 to share one cache between all workers; in-process otherwise.
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL")
+# Lifetime of the shared invalidation counters (see CacheBackend.generations).
+GENERATION_TTL_SECONDS = 24 * 60 * 60
+
+
+def estimate_size(value: Any, _depth: int = 0) -> int:
+    """Rough deep size in bytes; exact for the bytes/str payloads that dominate."""
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value) + 50
+    size = sys.getsizeof(value)
+    if _depth >= 4:
+        return size
+    if isinstance(value, dict):
+        return size + sum(
+            estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1)
+            for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return size + sum(estimate_size(item, _depth + 1) for item in value)
+    if hasattr(value, "__dict__"):
+        return size + estimate_size(vars(value), _depth + 1)
+    return size
+
+
+class CacheBackend:
+    """Storage behind TTLCache. Values must be picklable for shared backends."""
+
+    # Set by TTLCache; backends report evictions/expirations they observe.
+    metrics: CacheMetrics | None = None
+    # False for network stores: async callers then go through a worker thread.
+    in_process = False
+
+    def _record(self, key: str, counter: str):
+        if self.metrics is not None:
+            self.metrics.record(key, counter)
+
+    def get(self, key: str):
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl_seconds: int = 60, tags: Iterable[str] = ()):
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def invalidate_tags(self, *tags: str) -> int:
+        raise NotImplementedError
+
+    def generations(self, key: str, tags: Iterable[str] = ()) -> tuple:
+        """
+        Invalidation counters of `key` and `tags`, bumped by delete() and
+        invalidate_tags(); a loader result is only stored if they did not
+        move while it was computed.
+        """
+        return ()
+
+    def stats(self) -> dict:
+        return {}
+
+
+class MemoryBackend(CacheBackend):
+    """
+    Thread-safe in-process store with LRU eviction once either `max_entries` or
+    the approximate `max_bytes` budget is exceeded. A daemon thread sweeps
+    expired entries every `sweep_interval` seconds, in small batches so
+    readers never wait long on the lock.
+
+    Entries can be registered under tags ("jobs:search", "user:42", ...);
+    invalidate_tags() then drops exactly those entries, costing time
+    proportional to the number of matching entries, not the cache size.
+    """
+
+    in_process = True
+
+    def __init__(
+        self,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        max_bytes: int = CACHE_MAX_BYTES,
+        sweep_interval: float = CACHE_SWEEP_INTERVAL_SECONDS,
+    ):
+        self._store: OrderedDict[str, tuple[float, Any, int]] = OrderedDict()
+        self._expiry_heap: list[tuple[float, str]] = []
+        self._tag_index: dict[str, set[str]] = {}
+        self._key_tags: dict[str, tuple[str, ...]] = {}
         self._lock = threading.Lock()
+        self._bytes = 0
+        # "k:<key>" / "t:<tag>" -> times deleted / invalidated
+        self._generations: dict[str, int] = {}
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        if sweep_interval > 0:
+            self._sweeper = threading.Thread(
+                target=self._sweep_forever,
+                args=(sweep_interval,),
+                name="request-cache-sweeper",
+                daemon=True,
+            )
+            self._sweeper.start()
+
+    def _pop_locked(self, key: str):
+        item = self._store.pop(key, None)
+        if item is not None:
+            self._bytes -= item[2]
+        for tag in self._key_tags.pop(key, ()):
+            keys = self._tag_index.get(tag)
+            if keys is None:
+                continue
+            keys.discard(key)
+            if not keys:
+                del self._tag_index[tag]
+        return item
 
     def get(self, key: str):
         now = time.time()
@@ -14,26 +136,460 @@ class TTLCache:
             item = self._store.get(key)
             if not item:
                 return None
-            expires_at, value = item
+            expires_at, value, _ = item
             if expires_at < now:
-                self._store.pop(key, None)
+                self._pop_locked(key)
+                self._record(key, "expirations")
                 return None
+            self._store.move_to_end(key)
             return value
 
-    def set(self, key: str, value: Any, ttl_seconds: int = 60):
+    def set(self, key: str, value: Any, ttl_seconds: int = 60, tags: Iterable[str] = ()):
         expires_at = time.time() + ttl_seconds
+        size = estimate_size(value)
+        tags = tuple(dict.fromkeys(tags))
         with self._lock:
-            self._store[key] = (expires_at, value)
+            self._pop_locked(key)
+            if size > self.max_bytes:
+                return
+            self._store[key] = (expires_at, value, size)
+            self._bytes += size
+            heapq.heappush(self._expiry_heap, (expires_at, key))
+            if tags:
+                self._key_tags[key] = tags
+                for tag in tags:
+                    self._tag_index.setdefault(tag, set()).add(key)
+
+            while len(self._store) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._store))
+                self._pop_locked(oldest)
+                self._record(oldest, "evictions")
 
     def delete(self, key: str):
         with self._lock:
-            self._store.pop(key, None)
+            self._pop_locked(key)
+            self._generations[f"k:{key}"] = self._generations.get(f"k:{key}", 0) + 1
 
-    def delete_prefix(self, prefix: str):
+    def generations(self, key: str, tags: Iterable[str] = ()) -> tuple:
         with self._lock:
-            keys_to_delete = [key for key in self._store if key.startswith(prefix)]
-            for key in keys_to_delete:
-                self._store.pop(key, None)
+            return tuple(
+                self._generations.get(name, 0)
+                for name in (f"k:{key}", *(f"t:{tag}" for tag in tags))
+            )
+
+    def invalidate_tags(self, *tags: str) -> int:
+        """Drops every entry registered under any of `tags`; returns how many."""
+        removed = 0
+        with self._lock:
+            for tag in tags:
+                self._generations[f"t:{tag}"] = self._generations.get(f"t:{tag}", 0) + 1
+                for key in list(self._tag_index.get(tag, ())):
+                    self._pop_locked(key)
+                    self._record(key, "invalidations")
+                    removed += 1
+        return removed
+
+    def sweep(self, batch_size: int = 500) -> int:
+        """Drops expired entries; returns how many were removed."""
+        removed = 0
+        while True:
+            now = time.time()
+            with self._lock:
+                processed = 0
+                while self._expiry_heap and self._expiry_heap[0][0] < now and processed < batch_size:
+                    expires_at, key = heapq.heappop(self._expiry_heap)
+                    processed += 1
+                    item = self._store.get(key)
+                    # The heap keeps stale entries for keys that were re-set or evicted.
+                    if item is not None and item[0] == expires_at:
+                        self._pop_locked(key)
+                        self._record(key, "expirations")
+                        removed += 1
+                more = bool(self._expiry_heap) and self._expiry_heap[0][0] < now
+            if not more:
+                return removed
+
+    def _sweep_forever(self, interval: float):
+        while True:
+            time.sleep(interval)
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"Cache sweep failed: {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": "memory",
+                "entries": len(self._store),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+            }
+
+
+class RedisBackend(CacheBackend):
+    """
+    Shared store speaking the Redis protocol, so every worker sees the same
+    entries and invalidations. Values are pickled; tags are sorted sets of
+    keys scored by each key's expiry time, so members whose key has expired
+    are trimmed on every write to the tag (ZREMRANGEBYSCORE) instead of
+    piling up. A tag's own expiry only ever moves forward (EXPIRE NX/GT,
+    Redis >= 7).
+
+    `client` is anything with the redis-py API, e.g. fakeredis in tests.
+    """
+
+    def __init__(self, client, namespace: str = "ipcache:"):
+        self.client = client
+        self.namespace = namespace
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}k:{key}"
+
+    def _tag(self, tag: str) -> str:
+        # "z:", not the old "t:" plain sets, so a rolling deploy never hits WRONGTYPE.
+        return f"{self.namespace}z:{tag}"
+
+    def _generation(self, name: str) -> str:
+        return f"{self.namespace}g:{name}"
+
+    def _bump(self, pipe, *names: str):
+        for name in names:
+            generation_key = self._generation(name)
+            pipe.incr(generation_key)
+            # Outlives any loader call; a vanished counter reads as 0, i.e. "changed".
+            pipe.expire(generation_key, GENERATION_TTL_SECONDS)
+
+    def generations(self, key: str, tags: Iterable[str] = ()) -> tuple:
+        names = (f"k:{key}", *(f"t:{tag}" for tag in tags))
+        return tuple(int(value or 0) for value in self.client.mget([self._generation(name) for name in names]))
+
+    def get(self, key: str):
+        blob = self.client.get(self._key(key))
+        return pickle.loads(blob) if blob is not None else None
+
+    def set(self, key: str, value: Any, ttl_seconds: int = 60, tags: Iterable[str] = ()):
+        ttl = max(1, int(ttl_seconds))
+        redis_key = self._key(key)
+        now = time.time()
+        pipe = self.client.pipeline(transaction=False)
+        pipe.set(redis_key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), ex=ttl)
+        for tag in dict.fromkeys(tags):
+            tag_key = self._tag(tag)
+            pipe.zremrangebyscore(tag_key, "-inf", now)
+            pipe.zadd(tag_key, {redis_key: now + ttl})
+            pipe.expire(tag_key, ttl, nx=True)
+            pipe.expire(tag_key, ttl, gt=True)
+        pipe.execute()
+
+    def delete(self, key: str):
+        pipe = self.client.pipeline(transaction=False)
+        pipe.delete(self._key(key))
+        self._bump(pipe, f"k:{key}")
+        pipe.execute()
+
+    def invalidate_tags(self, *tags: str) -> int:
+        if not tags:
+            return 0
+        tag_keys = [self._tag(tag) for tag in tags]
+        # Bump first: a loader finishing after this point must not store its result.
+        pipe = self.client.pipeline(transaction=False)
+        self._bump(pipe, *(f"t:{tag}" for tag in tags))
+        pipe.execute()
+        pipe = self.client.pipeline(transaction=False)
+        for tag_key in tag_keys:
+            pipe.zrange(tag_key, 0, -1)
+        members = set().union(*pipe.execute())
+        removed = self.client.delete(*members) if members else 0
+        self.client.delete(*tag_keys)
+        return removed
+
+    def stats(self) -> dict:
+        from redis.exceptions import ResponseError
+
+        # SCAN, not DBSIZE: the DB may hold other namespaces and our tag sets.
+        entries = sum(1 for _ in self.client.scan_iter(match=f"{self.namespace}k:*", count=1000))
+        stats = {"backend": "redis", "entries": entries, "server_keys": self.client.dbsize()}
+        try:
+            # Redis evicts and expires on its own; these counters are server-wide.
+            info = self.client.info("stats")
+        except ResponseError:
+            # INFO is unsupported by some Redis-protocol servers and fakes (fakeredis).
+            return stats
+        stats["server_evicted_keys"] = info.get("evicted_keys")
+        stats["server_expired_keys"] = info.get("expired_keys")
+        return stats
+
+
+@dataclass
+class _Stamped:
+    """What TTLCache stores: the value plus the end of its fresh window."""
+    value: Any
+    fresh_until: float
+
+
+class _Flight:
+    """
+    One in-progress computation that concurrent callers wait on, from
+    threads (done.wait()) or from coroutines (await wait_async()).
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error: BaseException | None = None
+        self._lock = threading.Lock()
+        self._waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    def finish(self):
+        with self._lock:
+            self.done.set()
+            waiters, self._waiters = self._waiters, []
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_wake, future)
+
+    async def wait_async(self):
+        # Each waiter gets its own future: cancelling one caller leaves the
+        # computation and the other callers alone.
+        future = asyncio.get_running_loop().create_future()
+        with self._lock:
+            if self.done.is_set():
+                return
+            self._waiters.append((asyncio.get_running_loop(), future))
+        await future
+
+
+def _wake(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class TTLCache:
+    """
+    The request cache API used by the routers; storage is pluggable (see
+    CacheBackend) and defaults to the in-process MemoryBackend.
+
+    get_or_compute()/aget_or_compute() coalesce concurrent misses on a key
+    into one loader call, sync and async callers alike. With
+    stale_ttl_seconds, an expired value is kept that much longer and served
+    while a single background refresh runs.
+
+    Hits, misses, sets, evictions, expirations and loader time are counted
+    per key family in `metrics` (see services.cache_metrics).
+    """
+
+    def __init__(self, backend: CacheBackend | None = None, metrics: CacheMetrics | None = None):
+        self.backend = backend or MemoryBackend()
+        self.metrics = metrics or CacheMetrics()
+        self.backend.metrics = self.metrics
+        self._flights: dict[str, _Flight] = {}
+        self._flights_lock = threading.Lock()
+        # Async flights run as tasks of their own; keep them referenced until done.
+        self._flight_tasks: set[asyncio.Task] = set()
+
+    def _lookup(self, key: str) -> tuple[Any, bool]:
+        """(value, is_fresh); value is None on a miss."""
+        item = self.backend.get(key)
+        if item is None:
+            return None, False
+        return item.value, item.fresh_until >= time.time()
+
+    def get(self, key: str):
+        value, fresh = self._lookup(key)
+        self.metrics.record(key, "hits" if fresh else "misses")
+        return value if fresh else None
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl_seconds: int = 60,
+        tags: Iterable[str] = (),
+        stale_ttl_seconds: int = 0
+    ):
+        stamped = _Stamped(value, time.time() + ttl_seconds)
+        self.backend.set(key, stamped, ttl_seconds + stale_ttl_seconds, tags)
+        self.metrics.record(key, "sets")
+
+    def delete(self, key: str):
+        self.backend.delete(key)
+
+    def invalidate_tags(self, *tags: str) -> int:
+        return self.backend.invalidate_tags(*tags)
+
+    def stats(self) -> dict:
+        """Backend size plus the per-family counters."""
+        return {**self.backend.stats(), **self.metrics.snapshot()}
+
+    # --- single-flight, sync callers ---
+
+    def get_or_compute(
+        self,
+        key: str,
+        loader: Callable[[], Any],
+        ttl_seconds: int = 60,
+        tags: Iterable[str] = (),
+        stale_ttl_seconds: int = 0
+    ):
+        """
+        Cached value for `key`, or the result of loader(). Concurrent misses
+        wait for one loader call and share its result or exception. None
+        results are returned but not cached.
+        """
+        tags = tuple(tags)
+        value, fresh = self._lookup(key)
+        if fresh:
+            self.metrics.record(key, "hits")
+            return value
+        if value is not None:
+            self.metrics.record(key, "stale_hits")
+            self._refresh_in_background(key, loader, ttl_seconds, tags, stale_ttl_seconds)
+            return value
+
+        self.metrics.record(key, "misses")
+        with self._flights_lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if leader:
+            self._run_flight(key, flight, loader, ttl_seconds, tags, stale_ttl_seconds)
+        else:
+            self.metrics.record(key, "coalesced")
+            flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    def _store_unless_invalidated(self, key, generations, value, ttl_seconds, tags, stale_ttl_seconds):
+        # Invalidated while the loader ran: its result may predate the change.
+        if self.backend.generations(key, tags) != generations:
+            self.metrics.record(key, "discarded")
+            return
+        self.set(key, value, ttl_seconds, tags, stale_ttl_seconds)
+
+    def _run_flight(self, key, flight, loader, ttl_seconds, tags, stale_ttl_seconds):
+        started = time.perf_counter()
+        try:
+            generations = self.backend.generations(key, tags)
+            flight.value = loader()
+            self.metrics.record_compute(key, time.perf_counter() - started)
+            if flight.value is not None:
+                self._store_unless_invalidated(key, generations, flight.value, ttl_seconds, tags, stale_ttl_seconds)
+        except BaseException as e:
+            self.metrics.record_compute(key, time.perf_counter() - started, failed=True)
+            flight.error = e
+        finally:
+            with self._flights_lock:
+                self._flights.pop(key, None)
+            flight.finish()
+
+    def _refresh_in_background(self, key, loader, ttl_seconds, tags, stale_ttl_seconds):
+        with self._flights_lock:
+            if key in self._flights:
+                return
+            flight = self._flights[key] = _Flight()
+
+        def refresh():
+            self._run_flight(key, flight, loader, ttl_seconds, tags, stale_ttl_seconds)
+            if flight.error is not None:
+                print(f"Cache refresh failed for {key}: {flight.error}")
+
+        threading.Thread(target=refresh, name=f"cache-refresh:{key}", daemon=True).start()
+
+    # --- single-flight, async callers ---
+
+    async def _alookup(self, key: str) -> tuple[Any, bool]:
+        if self.backend.in_process:
+            return self._lookup(key)
+        return await asyncio.to_thread(self._lookup, key)
+
+    def _start_async_flight(self, key, loader, ttl_seconds, tags, stale_ttl_seconds) -> tuple[_Flight, bool]:
+        """The flight for `key` (sync or async) and whether this call started it."""
+        with self._flights_lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                return flight, False
+            flight = self._flights[key] = _Flight()
+        # Not awaited inline: the loader must survive the cancellation of
+        # whichever request happened to start it.
+        task = asyncio.ensure_future(self._arun_flight(key, flight, loader, ttl_seconds, tags, stale_ttl_seconds))
+        self._flight_tasks.add(task)
+        task.add_done_callback(self._flight_tasks.discard)
+        return flight, True
+
+    async def aget_or_compute(
+        self,
+        key: str,
+        loader: Callable[[], Any],
+        ttl_seconds: int = 60,
+        tags: Iterable[str] = (),
+        stale_ttl_seconds: int = 0
+    ):
+        """
+        Async twin of get_or_compute(). `loader` may be a coroutine function;
+        plain callables run in a worker thread so they never block the loop.
+        Shared backends are read and written from a worker thread as well.
+        """
+        tags = tuple(tags)
+        value, fresh = await self._alookup(key)
+        if fresh:
+            self.metrics.record(key, "hits")
+            return value
+        if value is not None:
+            self.metrics.record(key, "stale_hits")
+            self._start_async_flight(key, loader, ttl_seconds, tags, stale_ttl_seconds)
+            return value
+
+        self.metrics.record(key, "misses")
+        flight, leader = self._start_async_flight(key, loader, ttl_seconds, tags, stale_ttl_seconds)
+        if not leader:
+            self.metrics.record(key, "coalesced")
+        await flight.wait_async()
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    async def _arun_flight(self, key, flight, loader, ttl_seconds, tags, stale_ttl_seconds):
+        started = time.perf_counter()
+        try:
+            if self.backend.in_process:
+                generations = self.backend.generations(key, tags)
+            else:
+                generations = await asyncio.to_thread(self.backend.generations, key, tags)
+            if inspect.iscoroutinefunction(loader):
+                flight.value = await loader()
+            else:
+                flight.value = await asyncio.to_thread(loader)
+            self.metrics.record_compute(key, time.perf_counter() - started)
+            if flight.value is not None:
+                store = (key, generations, flight.value, ttl_seconds, tags, stale_ttl_seconds)
+                if self.backend.in_process:
+                    self._store_unless_invalidated(*store)
+                else:
+                    await asyncio.to_thread(self._store_unless_invalidated, *store)
+        except BaseException as e:
+            self.metrics.record_compute(key, time.perf_counter() - started, failed=True)
+            flight.error = e
+            if not isinstance(e, Exception):
+                raise
+        finally:
+            with self._flights_lock:
+                self._flights.pop(key, None)
+            flight.finish()
+
+
+def _backend_from_env() -> CacheBackend:
+    if not CACHE_REDIS_URL:
+        return MemoryBackend()
+    try:
+        import redis
+    except ImportError:
+        print("WARNING: CACHE_REDIS_URL is set but the redis package is missing; using the in-process cache.")
+        return MemoryBackend()
+    return RedisBackend(redis.Redis.from_url(CACHE_REDIS_URL))
 
 
-request_cache = TTLCache()
+request_cache = TTLCache(_backend_from_env())
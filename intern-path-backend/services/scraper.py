@@ -0,0 +1,352 @@
+import asyncio
+import codecs
+import hashlib
+import json
+import os
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlparse
+
+import httpx
+
+from database import models
+from database.dialects import insert_for
+
+
+SCRAPER_CONCURRENCY = int(os.getenv("SCRAPER_CONCURRENCY", "16"))
+SCRAPER_HOST_RATE = float(os.getenv("SCRAPER_HOST_RATE", "4"))  # requests per second per host
+SCRAPER_HOST_BURST = int(os.getenv("SCRAPER_HOST_BURST", "8"))
+SCRAPER_RETRIES = int(os.getenv("SCRAPER_RETRIES", "3"))
+SCRAPER_TIMEOUT_SECONDS = float(os.getenv("SCRAPER_TIMEOUT_SECONDS", "15"))
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+_RETRY_STATUSES = {429, 500, 502, 503, 504}
+_VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img",
+    "input", "link", "meta", "source", "track", "wbr",
+}
+
+DEFAULT_KEYWORDS = [
+    "python", "web-development", "data-science", "machine-learning",
+    "android-app-development", "front-end-development", "back-end-development",
+]
+
+
+@dataclass
+class ScrapeSource:
+    """
+    A listing site. Cards are the elements carrying `card_class`; inside a
+    card, `fields` maps an Internship column to the class of the element
+    holding its text. Columns in `multi_fields` collect every matching
+    element (e.g. one tag per skill) and are joined with ", ".
+    """
+    name: str
+    url_template: str  # formatted with keyword and page
+    card_class: str
+    fields: dict[str, str]
+    link_class: str | None = None
+    multi_fields: tuple[str, ...] = ("skills",)
+    keywords: list[str] = field(default_factory=lambda: list(DEFAULT_KEYWORDS))
+    pages: int = 3
+
+    def urls(self):
+        for keyword in self.keywords:
+            for page in range(1, self.pages + 1):
+                yield keyword, self.url_template.format(keyword=keyword, page=page)
+
+
+DEFAULT_SOURCES = [
+    ScrapeSource(
+        name="internshala",
+        url_template="https://internshala.com/internships/{keyword}-internship/page-{page}/",
+        card_class="individual_internship",
+        link_class="job-title-href",
+        fields={
+            "title": "job-internship-name",
+            "company": "company-name",
+            "location": "locations",
+            "duration": "duration",
+            "stipend": "stipend",
+            "skills": "job_skill",
+        },
+    ),
+]
+
+
+def load_sources() -> list[ScrapeSource]:
+    """SCRAPER_SOURCES_PATH may point at a JSON list of ScrapeSource fields."""
+    path = os.getenv("SCRAPER_SOURCES_PATH")
+    if not path:
+        return DEFAULT_SOURCES
+    with open(path, encoding="utf-8") as f:
+        return [ScrapeSource(**source) for source in json.load(f)]
+
+
+class ListingParser(HTMLParser):
+    """Incremental parser; feed() it chunks as they arrive and read .listings."""
+
+    def __init__(self, source: ScrapeSource, base_url: str):
+        super().__init__(convert_charrefs=True)
+        self.source = source
+        self.base_url = base_url
+        self.listings: list[dict] = []
+        self._field_classes = {cls: name for name, cls in source.fields.items()}
+        self._card: dict | None = None
+        self._depth = 0
+        self._captures: list[tuple[str, int, list[str]]] = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        classes = (attrs.get("class") or "").split()
+
+        if self._card is None:
+            if self.source.card_class in classes and tag not in _VOID_TAGS:
+                self._card = {}
+                self._depth = 1
+                if attrs.get("data-href"):
+                    self._card["link"] = urljoin(self.base_url, attrs["data-href"])
+            return
+
+        if tag in _VOID_TAGS:
+            return
+        self._depth += 1
+
+        for cls in classes:
+            name = self._field_classes.get(cls)
+            if name and (name in self.source.multi_fields or name not in self._card):
+                self._captures.append((name, self._depth, []))
+
+        if tag == "a" and attrs.get("href") and "link" not in self._card:
+            if self.source.link_class in classes or any(name == "title" for name, _, _ in self._captures):
+                self._card["link"] = urljoin(self.base_url, attrs["href"])
+
+    def handle_endtag(self, tag):
+        if self._card is None or tag in _VOID_TAGS:
+            return
+
+        still_open = []
+        for name, depth, parts in self._captures:
+            if depth < self._depth:
+                still_open.append((name, depth, parts))
+                continue
+            value = " ".join(" ".join(parts).split())
+            if not value:
+                continue
+            if name in self.source.multi_fields:
+                self._card.setdefault(name, []).append(value)
+            else:
+                self._card.setdefault(name, value)
+        self._captures = still_open
+
+        self._depth -= 1
+        if self._depth == 0:
+            self._finish_card()
+
+    def handle_data(self, data):
+        for _, _, parts in self._captures:
+            parts.append(data)
+
+    def _finish_card(self):
+        card, self._card, self._captures = self._card, None, []
+        for name in self.source.multi_fields:
+            if name in card:
+                card[name] = ", ".join(dict.fromkeys(card[name]))
+        if card.get("title") and card.get("link"):
+            self.listings.append(card)
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class _RetryableStatus(Exception):
+    pass
+
+
+@dataclass
+class ScrapeResult:
+    listings: list[dict] = field(default_factory=list)
+    crawl_state: dict[str, dict] = field(default_factory=dict)
+    unchanged_pages: int = 0
+
+
+class AsyncScraper:
+    """
+    Fetches listing pages concurrently over one pooled client: at most
+    `concurrency` requests in flight overall, a token bucket per host, and
+    retries with full-jitter exponential backoff. Pages are parsed while
+    they stream in.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = SCRAPER_CONCURRENCY,
+        host_rate: float = SCRAPER_HOST_RATE,
+        host_burst: int = SCRAPER_HOST_BURST,
+        retries: int = SCRAPER_RETRIES,
+        timeout: float = SCRAPER_TIMEOUT_SECONDS,
+        backoff_base: float = 0.5,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self.concurrency = concurrency
+        self.host_rate = host_rate
+        self.host_burst = host_burst
+        self.retries = retries
+        self.timeout = timeout
+        self.backoff_base = backoff_base
+        self.transport = transport
+        self._buckets: dict[str, TokenBucket] = {}
+
+    def _bucket(self, url: str) -> TokenBucket:
+        host = urlparse(url).netloc
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(self.host_rate, self.host_burst)
+        return self._buckets[host]
+
+    async def _fetch_page(self, client, semaphore, source, url, known: dict | None):
+        """
+        Returns (listings, crawl_state). listings is None when the page is
+        unchanged since the last crawl: a 304 to our conditional GET, or a
+        200 whose body hashes to the stored content hash.
+        """
+        headers = {}
+        if known and known.get("etag"):
+            headers["If-None-Match"] = known["etag"]
+        if known and known.get("last_modified"):
+            headers["If-Modified-Since"] = known["last_modified"]
+
+        for attempt in range(self.retries + 1):
+            await self._bucket(url).acquire()
+            try:
+                async with semaphore:
+                    async with client.stream("GET", url, headers=headers) as response:
+                        if response.status_code == 304 and known:
+                            return None, {**known, "last_status": 304}
+                        if response.status_code in _RETRY_STATUSES:
+                            raise _RetryableStatus(response.status_code)
+                        if response.status_code >= 400:
+                            return [], None
+
+                        digest = hashlib.sha256()
+                        decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+                        parser = ListingParser(source, str(response.url))
+                        async for chunk in response.aiter_bytes():
+                            digest.update(chunk)
+                            parser.feed(decoder.decode(chunk))
+                        parser.feed(decoder.decode(b"", final=True))
+                        parser.close()
+
+                        state = {
+                            "etag": response.headers.get("etag"),
+                            "last_modified": response.headers.get("last-modified"),
+                            "content_hash": digest.hexdigest(),
+                            "last_status": response.status_code,
+                        }
+                        if known and known.get("content_hash") == state["content_hash"]:
+                            return None, state
+                        return parser.listings, state
+            except (httpx.TransportError, _RetryableStatus) as e:
+                if attempt == self.retries:
+                    print(f"Scrape failed for {url}: {e!r}")
+                    return [], None
+                await asyncio.sleep(random.uniform(0, self.backoff_base * 2 ** attempt))
+        return [], None
+
+    async def scrape(self, sources: list[ScrapeSource], crawl_state: dict[str, dict] | None = None) -> ScrapeResult:
+        crawl_state = crawl_state or {}
+        limits = httpx.Limits(
+            max_connections=self.concurrency,
+            max_keepalive_connections=self.concurrency
+        )
+        semaphore = asyncio.Semaphore(self.concurrency)
+        async with httpx.AsyncClient(
+            limits=limits,
+            timeout=self.timeout,
+            headers={"User-Agent": USER_AGENT},
+            follow_redirects=True,
+            transport=self.transport,
+        ) as client:
+            targets = [
+                (source, keyword, url)
+                for source in sources
+                for keyword, url in source.urls()
+            ]
+            pages = await asyncio.gather(*(
+                self._fetch_page(client, semaphore, source, url, crawl_state.get(url))
+                for source, _, url in targets
+            ))
+
+        today = date.today()
+        result = ScrapeResult()
+        for (source, keyword, url), (cards, state) in zip(targets, pages):
+            if state is not None:
+                result.crawl_state[url] = state
+            if cards is None:
+                result.unchanged_pages += 1
+                continue
+            for card in cards:
+                result.listings.append({
+                    **card,
+                    "source": source.name,
+                    "keyword": keyword,
+                    "scraped_date": today,
+                })
+        return result
+
+
+def load_crawl_state(db, urls) -> dict[str, dict]:
+    rows = db.query(models.CrawlState).filter(models.CrawlState.url.in_(list(urls))).all()
+    return {
+        row.url: {
+            "etag": row.etag,
+            "last_modified": row.last_modified,
+            "content_hash": row.content_hash,
+            "last_status": row.last_status,
+        }
+        for row in rows
+    }
+
+
+def save_crawl_state(db, crawl_state: dict[str, dict]):
+    """Call only after the listings from these pages are committed, or they'd be skipped next run."""
+    if not crawl_state:
+        return
+    insert = insert_for(db.get_bind())
+    now = datetime.utcnow()
+    rows = [{"url": url, **state, "last_crawled_at": now} for url, state in crawl_state.items()]
+    stmt = insert(models.CrawlState).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["url"],
+        set_={column: stmt.excluded[column] for column in ("etag", "last_modified", "content_hash", "last_status", "last_crawled_at")}
+    )
+    db.execute(stmt)
+    db.commit()
+
+
+def scrape_listings(db, sources: list[ScrapeSource] | None = None) -> ScrapeResult:
+    """Sync entry point for background jobs; pages unchanged since the last run yield no listings."""
+    sources = sources or load_sources()
+    known = {}
+    # With no listings stored, conditional requests would only skip pages we need.
+    if db.query(models.Internship.id).first() is not None:
+        known = load_crawl_state(db, (url for source in sources for _, url in source.urls()))
+    return asyncio.run(AsyncScraper().scrape(sources, known))
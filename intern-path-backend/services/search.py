@@ -0,0 +1,173 @@
+import re
+
+from sqlalchemy import or_, text
+
+from database import models
+
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Kept identical between the trigram index and the queries, otherwise Postgres won't use the index.
+_PG_TRGM_EXPR = (
+    "(coalesce(title, '') || ' ' || coalesce(company, '') || ' ' || coalesce(skills, ''))"
+)
+
+
+class SearchBackend:
+    """
+    Ranked internship search. search() returns the ids of one page in
+    relevance order; callers load the rows they need themselves.
+
+    The base class is a plain LIKE scan used for dialects without a
+    dedicated engine.
+    """
+
+    def ensure_schema(self, engine):
+        pass
+
+    def search(self, db, q: str, limit: int, offset: int) -> list[int]:
+        return self._like_search(db, q, limit, offset)
+
+    def _like_search(self, db, q: str, limit: int, offset: int) -> list[int]:
+        pattern = f"%{q}%"
+        rows = (
+            db.query(models.Internship.id)
+            .filter(or_(
+                models.Internship.title.ilike(pattern),
+                models.Internship.company.ilike(pattern),
+                models.Internship.skills.ilike(pattern),
+                models.Internship.location.ilike(pattern),
+            ))
+            .order_by(models.Internship.id.desc())
+            .offset(offset)
+            .limit(limit)
+            .all()
+        )
+        return [row.id for row in rows]
+
+
+class PostgresSearchBackend(SearchBackend):
+    """
+    Full-text search over a generated, GIN-indexed tsvector column
+    (title > skills > company > location), with pg_trgm word similarity
+    as the fallback when nothing matches lexically (typos, partial words).
+    """
+
+    def ensure_schema(self, engine):
+        statements = [
+            "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+            """
+            ALTER TABLE internships ADD COLUMN IF NOT EXISTS search_vector tsvector
+            GENERATED ALWAYS AS (
+                setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+                setweight(to_tsvector('english', coalesce(skills, '')), 'B') ||
+                setweight(to_tsvector('english', coalesce(company, '')), 'C') ||
+                setweight(to_tsvector('english', coalesce(location, '')), 'D')
+            ) STORED
+            """,
+            "CREATE INDEX IF NOT EXISTS ix_internships_search_vector ON internships USING GIN (search_vector)",
+            f"CREATE INDEX IF NOT EXISTS ix_internships_search_trgm ON internships USING GIN ({_PG_TRGM_EXPR} gin_trgm_ops)",
+        ]
+        with engine.begin() as conn:
+            for statement in statements:
+                conn.execute(text(statement))
+
+    def search(self, db, q: str, limit: int, offset: int) -> list[int]:
+        params = {"q": q, "limit": limit, "offset": offset}
+        ids = db.execute(text("""
+            SELECT id
+            FROM internships, websearch_to_tsquery('english', :q) AS query
+            WHERE search_vector @@ query
+            ORDER BY ts_rank_cd(search_vector, query) DESC, id DESC
+            LIMIT :limit OFFSET :offset
+        """), params).scalars().all()
+
+        if ids or (offset and self._has_lexical_match(db, q)):
+            return list(ids)
+
+        return list(db.execute(text(f"""
+            SELECT id
+            FROM internships
+            WHERE :q <% {_PG_TRGM_EXPR}
+            ORDER BY word_similarity(:q, {_PG_TRGM_EXPR}) DESC, id DESC
+            LIMIT :limit OFFSET :offset
+        """), params).scalars().all())
+
+    def _has_lexical_match(self, db, q: str) -> bool:
+        return db.execute(text("""
+            SELECT 1 FROM internships
+            WHERE search_vector @@ websearch_to_tsquery('english', :q)
+            LIMIT 1
+        """), {"q": q}).first() is not None
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """
+    FTS5 external-content index kept in sync by triggers, for local runs
+    and tests. Every token is prefix-matched; falls back to LIKE.
+    """
+
+    def ensure_schema(self, engine):
+        statements = [
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS internships_fts USING fts5(
+                title, company, skills, location,
+                content='internships', content_rowid='id', tokenize='porter unicode61'
+            )
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS internships_fts_ai AFTER INSERT ON internships BEGIN
+                INSERT INTO internships_fts(rowid, title, company, skills, location)
+                VALUES (new.id, new.title, new.company, new.skills, new.location);
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS internships_fts_ad AFTER DELETE ON internships BEGIN
+                INSERT INTO internships_fts(internships_fts, rowid, title, company, skills, location)
+                VALUES ('delete', old.id, old.title, old.company, old.skills, old.location);
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS internships_fts_au AFTER UPDATE ON internships BEGIN
+                INSERT INTO internships_fts(internships_fts, rowid, title, company, skills, location)
+                VALUES ('delete', old.id, old.title, old.company, old.skills, old.location);
+                INSERT INTO internships_fts(rowid, title, company, skills, location)
+                VALUES (new.id, new.title, new.company, new.skills, new.location);
+            END
+            """,
+            "INSERT INTO internships_fts(internships_fts) VALUES ('rebuild')",
+        ]
+        with engine.begin() as conn:
+            for statement in statements:
+                conn.execute(text(statement))
+
+    def search(self, db, q: str, limit: int, offset: int) -> list[int]:
+        tokens = _TOKEN_PATTERN.findall(q)
+        if not tokens:
+            return self._like_search(db, q, limit, offset)
+
+        match = " ".join(f'"{token}"*' for token in tokens)
+        ids = db.execute(text("""
+            SELECT rowid
+            FROM internships_fts
+            WHERE internships_fts MATCH :match
+            ORDER BY bm25(internships_fts, 10.0, 2.0, 5.0, 1.0), rowid DESC
+            LIMIT :limit OFFSET :offset
+        """), {"match": match, "limit": limit, "offset": offset}).scalars().all()
+
+        if ids or (offset and self._has_fts_match(db, match)):
+            return list(ids)
+        return self._like_search(db, q, limit, offset)
+
+    def _has_fts_match(self, db, match: str) -> bool:
+        return db.execute(text(
+            "SELECT 1 FROM internships_fts WHERE internships_fts MATCH :match LIMIT 1"
+        ), {"match": match}).first() is not None
+
+
+def get_search_backend(engine) -> SearchBackend:
+    if engine.dialect.name == "postgresql":
+        return PostgresSearchBackend()
+    if engine.dialect.name == "sqlite":
+        return SQLiteSearchBackend()
+    return SearchBackend()
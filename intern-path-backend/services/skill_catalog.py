@@ -0,0 +1,87 @@
+from functools import lru_cache
+
+from database import models
+from database.dialects import insert_for
+
+
+@lru_cache(maxsize=5000)
+def parse_skill_text(skill_text: str) -> frozenset[str]:
+    if not skill_text:
+        return frozenset()
+    return frozenset(
+        part.strip().lower()[:100]
+        for part in skill_text.split(",")
+        if part and part.strip()
+    )
+
+
+def get_or_create_skill_ids(db, names) -> dict[str, int]:
+    names = set(names)
+    if not names:
+        return {}
+
+    insert = insert_for(db.get_bind())
+    # ON CONFLICT DO NOTHING keeps concurrent ingests from tripping over each other.
+    db.execute(
+        insert(models.Skill)
+        .values([{"name": name} for name in names])
+        .on_conflict_do_nothing(index_elements=["name"])
+    )
+    rows = db.query(models.Skill.id, models.Skill.name).filter(models.Skill.name.in_(names)).all()
+    return {row.name: row.id for row in rows}
+
+
+def sync_internship_skills(db, internships) -> dict[str, int]:
+    """
+    Rewrites internship_skills for `internships` from their skills text.
+    Returns the name -> skill id mapping it used. Caller commits.
+    """
+    internships = list(internships)
+    if not internships:
+        return {}
+
+    parsed = {internship.id: parse_skill_text(internship.skills or "") for internship in internships}
+    skill_ids = get_or_create_skill_ids(db, set().union(*parsed.values()))
+
+    db.query(models.InternshipSkill)\
+        .filter(models.InternshipSkill.internship_id.in_(parsed))\
+        .delete(synchronize_session=False)
+
+    links = [
+        {"internship_id": internship_id, "skill_id": skill_ids[name]}
+        for internship_id, names in parsed.items()
+        for name in names
+    ]
+    if links:
+        db.execute(models.InternshipSkill.__table__.insert(), links)
+    return skill_ids
+
+
+def backfill_internship_skills(db, batch_size: int = 2000):
+    """Populates internship_skills from the legacy comma-separated column."""
+    if db.query(models.InternshipSkill.internship_id).first() is not None:
+        return
+
+    last_id = 0
+    while True:
+        batch = db.query(models.Internship.id, models.Internship.skills)\
+            .filter(models.Internship.id > last_id)\
+            .order_by(models.Internship.id)\
+            .limit(batch_size)\
+            .all()
+        if not batch:
+            break
+        sync_internship_skills(db, batch)
+        db.commit()
+        last_id = batch[-1].id
+
+
+if __name__ == "__main__":
+    from database.database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        backfill_internship_skills(session)
+        print("internship_skills backfilled")
+    finally:
+        session.close()
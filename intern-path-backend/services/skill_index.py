@@ -0,0 +1,217 @@
+import heapq
+import os
+import threading
+import time
+
+from database import models
+from database.database import SessionLocal
+from services.skill_catalog import parse_skill_text
+
+
+# Writes in this process update the index in place; other workers' ingests
+# only show up through this background refresh (0 disables it).
+SKILL_INDEX_REFRESH_SECONDS = int(os.getenv("SKILL_INDEX_REFRESH_SECONDS", "900"))
+
+# Columns returned with every recommendation.
+_ROW_FIELDS = ("title", "company", "duration", "location", "link", "skills", "stipend")
+
+
+class SkillIndex:
+    """
+    In-memory skill id -> internship id posting lists.
+
+    Built once from the internship_skills join table and then kept up to
+    date with upsert() from the write paths, so recommendations never scan
+    the internships table. Periodic refreshes run in a background thread
+    while the current snapshot keeps serving. Writes that arrive while a
+    build is reading the database are queued and replayed onto the new
+    snapshot.
+    """
+
+    def __init__(self, refresh_seconds: int = SKILL_INDEX_REFRESH_SECONDS):
+        self._skill_ids: dict[str, int] = {}
+        self._skill_names: dict[int, str] = {}
+        self._postings: dict[int, set[int]] = {}
+        self._skills: dict[int, frozenset[int]] = {}
+        self._rows: dict[int, tuple] = {}
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._built_at: float | None = None
+        self._refresh_seconds = refresh_seconds
+        self._refreshing = False
+        self._refresh_started_at = 0.0
+        # Set while build() reads the database; None otherwise.
+        self._pending: list[tuple] | None = None
+        self._generation = 0
+
+    def ensure_built(self, db):
+        """Builds inline only the first time; later calls at most start a background refresh."""
+        if self._built_at is None:
+            with self._build_lock:
+                if self._built_at is None:
+                    self.build(db)
+            return
+        last_attempt = max(self._built_at, self._refresh_started_at)
+        if self._refresh_seconds > 0 and time.time() - last_attempt >= self._refresh_seconds:
+            self._refresh_in_background()
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+            self._refresh_started_at = time.time()
+
+        def refresh():
+            try:
+                with self._build_lock, SessionLocal() as db:
+                    self.build(db)
+            except Exception as e:
+                # Keep serving the current snapshot; the next call retries.
+                print(f"Skill index refresh failed: {e}")
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=refresh, name="skill-index-refresh", daemon=True).start()
+
+    def build(self, db):
+        with self._lock:
+            self._pending = []
+            generation = self._generation
+        try:
+            snapshot = self._read(db)
+        except BaseException:
+            with self._lock:
+                self._pending = None
+            raise
+
+        skill_ids, links, rows = snapshot
+        postings: dict[int, set[int]] = {}
+        for internship_id in rows:
+            for skill_id in links[internship_id]:
+                postings.setdefault(skill_id, set()).add(internship_id)
+
+        with self._lock:
+            pending, self._pending = self._pending, None
+            if generation != self._generation:
+                # reset() ran meanwhile; this snapshot may predate it.
+                return
+            self._skill_ids = skill_ids
+            self._skill_names = {skill_id: name for name, skill_id in skill_ids.items()}
+            self._postings = postings
+            self._skills = {internship_id: frozenset(links[internship_id]) for internship_id in rows}
+            self._rows = rows
+            self._built_at = time.time()
+            # The snapshot may have been read before these writes committed.
+            for rows, skill_ids in pending:
+                self._upsert_locked(rows, skill_ids)
+
+    def _read(self, db):
+        skill_ids = {row.name: row.id for row in db.query(models.Skill.id, models.Skill.name)}
+
+        links: dict[int, set[int]] = {}
+        link_query = db.query(
+            models.InternshipSkill.internship_id,
+            models.InternshipSkill.skill_id
+        ).execution_options(yield_per=20000)
+        for internship_id, skill_id in link_query:
+            links.setdefault(internship_id, set()).add(skill_id)
+
+        rows: dict[int, tuple] = {}
+        row_query = db.query(
+            models.Internship.id,
+            *(getattr(models.Internship, field) for field in _ROW_FIELDS)
+        ).execution_options(yield_per=5000)
+        for row in row_query:
+            if row.id in links:
+                rows[row.id] = tuple(row[1:])
+        return skill_ids, links, rows
+
+    def reset(self):
+        with self._lock:
+            self._generation += 1
+            self._pending = None
+            self._skill_ids = {}
+            self._skill_names = {}
+            self._postings = {}
+            self._skills = {}
+            self._rows = {}
+            self._built_at = None
+
+    def _remove_locked(self, internship_id: int):
+        for skill_id in self._skills.pop(internship_id, ()):
+            posting = self._postings.get(skill_id)
+            if posting is None:
+                continue
+            posting.discard(internship_id)
+            if not posting:
+                del self._postings[skill_id]
+        self._rows.pop(internship_id, None)
+
+    def upsert(self, rows, skill_ids: dict[str, int]):
+        """
+        rows: objects or mappings exposing id plus the recommendation fields.
+        skill_ids: name -> id for every skill of those rows, as returned by
+        skill_catalog.sync_internship_skills.
+        """
+        rows = list(rows)
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((rows, skill_ids))
+            if self._built_at is None:
+                # Not built yet; the first build reads these rows (or replays them).
+                return
+            self._upsert_locked(rows, skill_ids)
+
+    def _upsert_locked(self, rows, skill_ids: dict[str, int]):
+        for name, skill_id in skill_ids.items():
+            self._skill_ids[name] = skill_id
+            self._skill_names[skill_id] = name
+
+        for row in rows:
+            get = row.get if isinstance(row, dict) else lambda field: getattr(row, field)
+            internship_id = get("id")
+            self._remove_locked(internship_id)
+
+            required = frozenset(skill_ids[name] for name in parse_skill_text(get("skills") or ""))
+            if not required:
+                continue
+            self._skills[internship_id] = required
+            self._rows[internship_id] = tuple(get(field) for field in _ROW_FIELDS)
+            for skill_id in required:
+                self._postings.setdefault(skill_id, set()).add(internship_id)
+
+    def recommend(self, user_skills: set[str], limit: int = 20) -> list[dict]:
+        with self._lock:
+            user_skill_ids = {
+                self._skill_ids[name] for name in user_skills if name in self._skill_ids
+            }
+
+            match_counts: dict[int, int] = {}
+            for skill_id in user_skill_ids:
+                for internship_id in self._postings.get(skill_id, ()):
+                    match_counts[internship_id] = match_counts.get(internship_id, 0) + 1
+
+            scored = (
+                (int((count / len(self._skills[internship_id])) * 100), internship_id)
+                for internship_id, count in match_counts.items()
+            )
+            # Ties go to the newest listing (highest id).
+            top = heapq.nlargest(limit, (item for item in scored if item[0] > 0))
+
+            recommendations = []
+            for match_percentage, internship_id in top:
+                row = dict(zip(_ROW_FIELDS, self._rows[internship_id]))
+                recommendations.append({
+                    "id": internship_id,
+                    **row,
+                    "match_percentage": match_percentage,
+                    "skill_gap": [
+                        self._skill_names[skill_id]
+                        for skill_id in self._skills[internship_id] - user_skill_ids
+                    ]
+                })
+            return recommendations
+
+
+skill_index = SkillIndex()
@@ -0,0 +1,29 @@
+import os
+import sys
+import tempfile
+
+# Settings are read at import time; point everything at throwaway local stores.
+os.environ.setdefault("DB_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="internpath-tests-"), "test.db"))
+os.environ.setdefault("SCRAPER_API_KEY", "test-key")
+os.environ.setdefault("CACHE_WARM_ON_STARTUP", "0")
+os.environ.setdefault("PASSWORD_POOL_WORKERS", "0")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    """A session on freshly created tables, search index included."""
+    from database import database, models
+    from services.search import get_search_backend
+
+    models.Base.metadata.drop_all(bind=database.engine)
+    models.Base.metadata.create_all(bind=database.engine)
+    get_search_backend(database.engine).ensure_schema(database.engine)
+    session = database.SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
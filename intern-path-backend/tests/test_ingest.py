@@ -0,0 +1,97 @@
+from datetime import date
+
+import pytest
+
+from database import models
+from services import ingest
+
+
+def listing(n, **overrides):
+    return {
+        "title": f"Python Intern {n}",
+        "company": "Acme",
+        "link": f"https://jobs.example/{n}",
+        "skills": "Python, SQL",
+        "scraped_date": date(2026, 1, 1),
+        **overrides,
+    }
+
+
+@pytest.fixture
+def invalidated(monkeypatch):
+    """Tag lists passed to request_cache.invalidate_tags, one per call."""
+    calls = []
+    monkeypatch.setattr(ingest.request_cache, "invalidate_tags", lambda *tags: calls.append(set(tags)))
+    return calls
+
+
+@pytest.fixture
+def chunks_of_two(monkeypatch):
+    monkeypatch.setattr(ingest, "INGEST_CHUNK_SIZE", 2)
+
+
+def test_upserts_in_chunks_and_invalidates_once(db, invalidated, chunks_of_two):
+    result = ingest.upsert_internships(db, [listing(n) for n in range(5)] + [listing(0, title=" Python Intern 0 ")])
+
+    assert result == {"received": 5, "upserted": 5}
+    assert db.query(models.Internship).count() == 5
+    assert len(invalidated) == 1
+    assert {"jobs:list", "jobs:search", "jobs:recommend"} <= invalidated[0]
+
+
+def test_unchanged_rows_are_not_rewritten(db, invalidated):
+    ingest.upsert_internships(db, [listing(1), listing(2)])
+    result = ingest.upsert_internships(db, [listing(1, scraped_date=date(2026, 2, 1)), listing(2)])
+
+    assert result == {"received": 2, "upserted": 0}
+    assert len(invalidated) == 1
+    row = db.query(models.Internship).filter_by(link="https://jobs.example/1").one()
+    assert row.scraped_date == date(2026, 1, 1)
+
+
+def test_content_change_updates_row_and_scraped_date(db, invalidated):
+    ingest.upsert_internships(db, [listing(1)])
+    result = ingest.upsert_internships(db, [listing(1, stipend="10000 /month", scraped_date=date(2026, 2, 1))])
+
+    assert result["upserted"] == 1
+    db.expire_all()
+    row = db.query(models.Internship).filter_by(link="https://jobs.example/1").one()
+    assert (row.stipend, row.scraped_date) == ("10000 /month", date(2026, 2, 1))
+    assert len(invalidated) == 2
+
+
+def test_failed_chunk_keeps_earlier_chunks_and_still_invalidates(db, invalidated, chunks_of_two, monkeypatch):
+    classify = ingest.classify_internships
+    calls = []
+
+    def fail_second_chunk(session, rows):
+        calls.append(rows)
+        if len(calls) == 2:
+            raise RuntimeError("boom")
+        return classify(session, rows)
+
+    monkeypatch.setattr(ingest, "classify_internships", fail_second_chunk)
+
+    with pytest.raises(RuntimeError):
+        ingest.upsert_internships(db, [listing(n) for n in range(4)])
+
+    assert db.query(models.Internship).count() == 2
+    assert len(invalidated) == 1
+
+
+def test_run_ingest_job_records_outcome(db, invalidated, monkeypatch):
+    scheduled = []
+    monkeypatch.setattr(ingest.cache_warmer, "schedule", scheduled.append)
+
+    job = ingest.create_ingest_job(db)
+    ingest.run_ingest_job(job.id, [listing(1), listing(2)])
+    failed = ingest.create_ingest_job(db)
+    ingest.run_ingest_job(failed.id, [{"title": "no link"}])
+
+    db.expire_all()
+    job = db.get(models.IngestJob, job.id)
+    assert (job.status, job.received, job.upserted) == ("succeeded", 2, 2)
+    assert scheduled == [f"ingest {job.id}"]
+    failed = db.get(models.IngestJob, failed.id)
+    assert failed.status == "failed"
+    assert failed.error
@@ -0,0 +1,66 @@
+import time
+
+import fakeredis
+import pytest
+
+from services.request_cache import MemoryBackend, RedisBackend, TTLCache
+
+
+@pytest.fixture
+def redis_client():
+    return fakeredis.FakeRedis()
+
+
+@pytest.fixture(params=["memory", "redis"])
+def cache(request, redis_client):
+    if request.param == "memory":
+        return TTLCache(MemoryBackend(sweep_interval=0))
+    return TTLCache(RedisBackend(redis_client))
+
+
+def test_get_or_compute_caches_and_invalidates_by_tag(cache):
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return {"page": len(calls)}
+
+    assert cache.get_or_compute("jobs:list:1", loader, tags=("jobs",)) == {"page": 1}
+    assert cache.get_or_compute("jobs:list:1", loader, tags=("jobs",)) == {"page": 1}
+    assert cache.invalidate_tags("jobs") == 1
+    assert cache.get_or_compute("jobs:list:1", loader, tags=("jobs",)) == {"page": 2}
+
+
+def test_none_results_are_not_cached(cache):
+    assert cache.get_or_compute("web:search:x", lambda: None) is None
+    assert cache.get_or_compute("web:search:x", lambda: "found") == "found"
+
+
+def test_result_invalidated_mid_flight_is_not_stored(cache):
+    def loader():
+        cache.invalidate_tags("jobs")
+        return "before the change"
+
+    assert cache.get_or_compute("jobs:list:1", loader, tags=("jobs",)) == "before the change"
+    assert cache.get("jobs:list:1") is None
+
+
+def test_redis_tag_sets_drop_expired_members(redis_client):
+    backend = RedisBackend(redis_client)
+    cache = TTLCache(backend)
+    for i in range(20):
+        cache.set(f"web:search:{i}", i, ttl_seconds=1, tags=("web:search",))
+    time.sleep(1.1)
+    cache.set("web:search:live", "x", ttl_seconds=60, tags=("web:search",))
+
+    assert redis_client.zcard(backend._tag("web:search")) == 1
+
+
+def test_redis_stats_without_info_support(redis_client):
+    cache = TTLCache(RedisBackend(redis_client, namespace="ours:"))
+    redis_client.set("someone-else", 1)
+    cache.set("jobs:list:1", 1, tags=("jobs",))
+
+    stats = cache.stats()
+    assert stats["backend"] == "redis"
+    assert stats["entries"] == 1
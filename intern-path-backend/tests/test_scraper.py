@@ -0,0 +1,154 @@
+import asyncio
+
+import httpx
+
+from database import models
+from services import scraper
+from services.scraper import AsyncScraper, ScrapeSource, load_crawl_state, save_crawl_state
+
+PAGE = """
+<html><body>
+<div class="card" data-href="/jobs/1">
+  <h3 class="title">Backend <b>Intern</b></h3>
+  <span class="company">Acme</span>
+  <span class="skill">Python</span><span class="skill">SQL</span><span class="skill">Python</span>
+  <img src="logo.png"><br>
+</div>
+<div class="card">
+  <a class="title" href="https://other.example/jobs/2">Data Intern</a>
+  <span class="company">Globex</span>
+</div>
+<div class="card"><span class="company">No title, skipped</span></div>
+</body></html>
+"""
+
+URL = "https://jobs.example/python/1"
+
+
+def make_source(**overrides):
+    options = dict(
+        name="fixture",
+        url_template="https://jobs.example/{keyword}/{page}",
+        card_class="card",
+        fields={"title": "title", "company": "company", "skills": "skill"},
+        keywords=["python"],
+        pages=1,
+    )
+    options.update(overrides)
+    return ScrapeSource(**options)
+
+
+class FixtureSite:
+    """MockTransport handler serving PAGE; `statuses` are returned first, in order."""
+
+    def __init__(self, statuses=(), etag='"v1"'):
+        self.statuses = list(statuses)
+        self.etag = etag
+        self.requests: list[httpx.Request] = []
+
+    def __call__(self, request):
+        self.requests.append(request)
+        if self.statuses:
+            return httpx.Response(self.statuses.pop(0))
+        if request.headers.get("if-none-match") == self.etag:
+            return httpx.Response(304)
+        return httpx.Response(200, headers={"ETag": self.etag}, text=PAGE)
+
+
+def scrape(site, crawl_state=None, **options):
+    options.setdefault("backoff_base", 0)
+    client = AsyncScraper(transport=httpx.MockTransport(site), **options)
+    return asyncio.run(client.scrape([make_source()], crawl_state))
+
+
+def test_parses_listing_cards():
+    result = scrape(FixtureSite())
+
+    assert [(l["title"], l["company"], l["link"]) for l in result.listings] == [
+        ("Backend Intern", "Acme", "https://jobs.example/jobs/1"),
+        ("Data Intern", "Globex", "https://other.example/jobs/2"),
+    ]
+    assert result.listings[0]["skills"] == "Python, SQL"
+    assert result.listings[0]["source"] == "fixture"
+    assert result.listings[0]["keyword"] == "python"
+    assert result.crawl_state[URL]["etag"] == '"v1"'
+    assert result.crawl_state[URL]["last_status"] == 200
+    assert result.unchanged_pages == 0
+
+
+def test_conditional_get_skips_unchanged_page():
+    site = FixtureSite()
+    first = scrape(site)
+    second = scrape(site, first.crawl_state)
+
+    assert site.requests[1].headers["if-none-match"] == '"v1"'
+    assert second.listings == []
+    assert second.unchanged_pages == 1
+    assert second.crawl_state[URL]["last_status"] == 304
+    assert second.crawl_state[URL]["content_hash"] == first.crawl_state[URL]["content_hash"]
+
+
+def test_matching_content_hash_skips_page_without_etag_support():
+    site = FixtureSite()
+    first = scrape(site)
+    # The server changed its ETag but not the page.
+    site.etag = '"v2"'
+    second = scrape(site, first.crawl_state)
+
+    assert second.listings == []
+    assert second.unchanged_pages == 1
+    assert second.crawl_state[URL]["etag"] == '"v2"'
+
+
+def test_retries_retryable_statuses():
+    site = FixtureSite(statuses=[503, 429])
+    result = scrape(site, retries=2)
+
+    assert len(site.requests) == 3
+    assert len(result.listings) == 2
+
+
+def test_gives_up_after_retries():
+    site = FixtureSite(statuses=[503] * 3)
+    result = scrape(site, retries=1)
+
+    assert len(site.requests) == 2
+    assert result.listings == []
+    assert result.crawl_state == {}
+
+
+def test_client_error_yields_no_listings_or_state():
+    result = scrape(FixtureSite(statuses=[404]))
+
+    assert result.listings == []
+    assert result.crawl_state == {}
+    assert result.unchanged_pages == 0
+
+
+def test_crawl_state_roundtrip(db):
+    state = {URL: {"etag": '"v1"', "last_modified": None, "content_hash": "abc", "last_status": 200}}
+    save_crawl_state(db, state)
+    save_crawl_state(db, {URL: {**state[URL], "content_hash": "def"}})
+
+    assert load_crawl_state(db, [URL, "https://jobs.example/other"]) == {
+        URL: {**state[URL], "content_hash": "def"}
+    }
+
+
+def test_scrape_listings_ignores_crawl_state_without_listings(db, monkeypatch):
+    save_crawl_state(db, {URL: {"etag": '"v1"', "last_modified": None, "content_hash": "abc", "last_status": 200}})
+    seen = []
+
+    class RecordingScraper(AsyncScraper):
+        async def scrape(self, sources, crawl_state=None):
+            seen.append(crawl_state)
+            return scraper.ScrapeResult()
+
+    monkeypatch.setattr(scraper, "AsyncScraper", RecordingScraper)
+    scraper.scrape_listings(db, [make_source()])
+    db.add(models.Internship(title="Intern", link="https://jobs.example/jobs/1"))
+    db.commit()
+    scraper.scrape_listings(db, [make_source()])
+
+    assert seen[0] == {}
+    assert set(seen[1]) == {URL}
@@ -0,0 +1,80 @@
+import pytest
+
+from database import models
+from services.search import SearchBackend, SQLiteSearchBackend
+
+LISTINGS = [
+    ("Marketing Intern", "Acme", "Excel, Python", "Mumbai"),
+    ("Python Developer Intern", "Globex", "Django, SQL", "Pune"),
+    ("Data Analyst Intern", "Initech", "SQL, Tableau", "Remote"),
+    ("C++ Systems Intern", "Hooli", "C++, Linux", "Bangalore"),
+]
+
+
+@pytest.fixture
+def listings(db):
+    rows = [
+        models.Internship(title=title, company=company, skills=skills, location=location, link=f"https://jobs.example/{i}")
+        for i, (title, company, skills, location) in enumerate(LISTINGS)
+    ]
+    db.add_all(rows)
+    db.commit()
+    return {row.title: row.id for row in rows}
+
+
+@pytest.fixture
+def backend():
+    return SQLiteSearchBackend()
+
+
+def test_title_matches_rank_above_skill_matches(db, listings, backend):
+    assert backend.search(db, "python", 10, 0) == [
+        listings["Python Developer Intern"],
+        listings["Marketing Intern"],
+    ]
+
+
+def test_tokens_are_prefix_matched_and_stemmed(db, listings, backend):
+    assert backend.search(db, "analy", 10, 0) == [listings["Data Analyst Intern"]]
+    assert backend.search(db, "developers", 10, 0) == [listings["Python Developer Intern"]]
+
+
+def test_pages_through_fts_results(db, listings, backend):
+    first = backend.search(db, "sql", 1, 0)
+    second = backend.search(db, "sql", 1, 1)
+
+    assert len(first) == len(second) == 1
+    assert set(first + second) == {listings["Python Developer Intern"], listings["Data Analyst Intern"]}
+    # Past the last FTS hit is an empty page, not a LIKE fallback.
+    assert backend.search(db, "sql", 1, 2) == []
+
+
+def test_falls_back_to_like_without_fts_match(db, listings, backend):
+    # A substring inside a word: no token starts with "ytho".
+    assert backend.search(db, "ytho", 10, 0) == [
+        listings["Python Developer Intern"],
+        listings["Marketing Intern"],
+    ]
+
+
+def test_falls_back_to_like_without_tokens(db, listings, backend):
+    assert backend.search(db, "++", 10, 0) == [listings["C++ Systems Intern"]]
+
+
+def test_triggers_keep_index_in_sync(db, listings, backend):
+    row = db.get(models.Internship, listings["Marketing Intern"])
+    row.title = "Growth Intern"
+    db.delete(db.get(models.Internship, listings["Data Analyst Intern"]))
+    db.commit()
+
+    assert backend.search(db, "growth", 10, 0) == [row.id]
+    assert backend.search(db, "marketing", 10, 0) == []
+    assert backend.search(db, "tableau", 10, 0) == []
+
+
+def test_base_backend_is_a_like_scan(db, listings):
+    # Newest first, like the listing endpoints.
+    assert SearchBackend().search(db, "intern", 2, 1) == [
+        listings["Data Analyst Intern"],
+        listings["Python Developer Intern"],
+    ]
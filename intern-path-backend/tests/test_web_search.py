@@ -0,0 +1,30 @@
+from ai import tools
+
+
+class FakeDDGS:
+    results: list[dict] = []
+    calls = 0
+
+    def text(self, query, max_results):
+        FakeDDGS.calls += 1
+        return iter(FakeDDGS.results)
+
+
+def test_empty_results_are_not_cached(monkeypatch):
+    monkeypatch.setattr(tools, "DDGS", FakeDDGS)
+    monkeypatch.setattr(FakeDDGS, "calls", 0)
+    monkeypatch.setattr(FakeDDGS, "results", [])
+    query = "latest rust internships in pune"
+    tools.request_cache.invalidate_tags("web:search")
+
+    assert tools.web_search.invoke(query) == "No current information found from web search."
+
+    FakeDDGS.results = [{"title": "Rust Intern", "body": "Pune, 6 months", "href": "https://jobs.example/1"}]
+    assert "Rust Intern" in tools.web_search.invoke(query)
+    assert "Rust Intern" in tools.web_search.invoke("pune rust internships latest")
+    assert FakeDDGS.calls == 2
+
+
+def test_normalize_search_query_drops_stopwords_and_order():
+    assert tools.normalize_search_query("What are the latest Python internships?") == \
+        tools.normalize_search_query("latest internships for python")